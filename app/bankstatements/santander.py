@@ -1,119 +1,170 @@
 # app/bankstatements/santander.py
 from __future__ import annotations
+import re
+import numpy as np
 import pandas as pd
 from .base import BankStatementParser
 
+# Patrones compilados una sola vez a nivel de módulo
+_COMISIONES_RE = re.compile(
+    r"\bcom\.?\s*manten|comisi[oó]n|gastos?\s+bancarios?|cargo[s]?\s+por\s+servicio|mantenci[oó]n",
+    re.IGNORECASE,
+)
+_WS_RE = re.compile(r"\s+")
+
+# Encabezados de la cartola (normalizados con strip + lower) -> nombres internos
+_COLUMN_MAP = {
+    "monto": "amount",
+    "descripción movimiento": "description",
+    "descripcion movimiento": "description",
+    "fecha": "date",
+    "n° documento": "document_number",
+    "n°  documento": "document_number",
+    "sucursal": "branch",
+    "cargo/abono": "debit_credit",
+}
+
+# Formatos de fecha de Santander (ruta rápida); el resto se infiere.
+# ISO explícito: con dayfirst=True pandas lee '2025-01-05' como 1 de mayo.
+_DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "ISO8601")
+
+# Dtype de texto respaldado por Arrow (con NaN como faltante) si pyarrow está disponible
+try:
+    import pyarrow  # noqa: F401
+    try:
+        _TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:  # pandas < 2.3
+        _TEXT_DTYPE = "string[pyarrow_numpy]"
+except ImportError:
+    _TEXT_DTYPE = str
+
 
 class SantanderParser(BankStatementParser):
+    # Limpieza de montos en una sola pasada: quita espacios (normales y no-break)
+    # y separadores de miles, y convierte la coma decimal a punto
+    _AMOUNT_TRANS = str.maketrans({"\u00a0": None, " ": None, ".": None, ",": "."})
+
     def parse(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Nada que procesar (p.ej. reruns con estado vacío): evitar todo el pipeline
+        if df.empty or df.shape[1] < 2:
+            return self._empty_result()
+
         # --- 1) Detectar encabezado real (busca 'MONTO' y 'DESCRIP') ---
-        df_nohdr = df.copy()
-        df_nohdr.columns = range(len(df_nohdr.columns))
-        header_idx = None
-        for i in range(min(50, len(df_nohdr))):
-            row = df_nohdr.iloc[i].astype(str).str.strip().str.lower()
-            if row.str.contains("monto").any() and row.str.contains("descrip").any():
-                header_idx = i
-                break
+        # Escaneo posicional sobre la hoja original: no se copia el DataFrame de entrada
+        head = np.char.lower(df.iloc[:50].to_numpy(dtype=object).astype(str))
+        has_monto = (np.char.find(head, "monto") >= 0).any(axis=1)
+        has_descrip = (np.char.find(head, "descrip") >= 0).any(axis=1)
+        found = np.flatnonzero(has_monto & has_descrip)
+        header_idx = int(found[0]) if len(found) else None
 
         if header_idx is None:
-            working = df.copy()
+            working = df
+            headers = list(df.columns)
         else:
-            headers = df_nohdr.iloc[header_idx].astype(str).str.strip().tolist()
-            working = df_nohdr.iloc[header_idx + 1:].reset_index(drop=True).copy()
-            working.columns = headers
+            headers = [str(h).strip() for h in df.iloc[header_idx].to_numpy()]
+            working = df.iloc[header_idx + 1:]
 
         # --- 2) Normalizar nombres internos ---
-        mapping = {
-            "monto": "amount",
-            "descripción movimiento": "description",
-            "descripcion movimiento": "description",
-            "fecha": "date",
-            "n° documento": "document_number",
-            "n°  documento": "document_number",
-            "n° documento ": "document_number",
-            "sucursal": "branch",
-            "cargo/abono": "debit_credit",
-        }
-        working.columns = [mapping.get(str(c).strip().lower(), str(c).strip().lower()) for c in working.columns]
+        keys = [str(c).strip().lower() for c in headers]
+        names = [_COLUMN_MAP.get(k, k) for k in keys]
 
         # --- 3) Mantener columnas necesarias y limpiar ---
-        cols = [c for c in ["date", "description", "amount", "debit_credit"] if c in working.columns]
-        out = working[cols].copy()
+        # Solo se copian las columnas seleccionadas (por posición)
+        cols = [c for c in ["date", "description", "amount", "debit_credit"] if c in names]
+        out = working.iloc[:, [names.index(c) for c in cols]].copy()
+        out.columns = cols
 
-        for c in out.columns:
-            out[c] = out[c].astype(str).str.strip()
+        # Solo las columnas de texto; monto y fecha se convierten en sus propios pasos
+        for c in ("description", "debit_credit"):
+            if c in out.columns:
+                out[c] = out[c].astype(_TEXT_DTYPE).str.strip()
 
         # --- 4) Limpiar y convertir montos (formato chileno: miles con '.' y decimal con ',') ---
         if "amount" in out.columns:
-            # Limpiar espacios no-break y espacios normales
-            amt = (out["amount"]
-                   .str.replace("\u00a0", "", regex=False)  # Espacio no-break
-                   .str.replace(" ", "", regex=False)  # Espacios normales
-                   .str.replace(".", "", regex=False)  # Quitar separadores de miles
-                   .str.replace(",", ".", regex=False))  # Coma decimal a punto
+            tbl = self._AMOUNT_TRANS
+            amt = [v.translate(tbl) if isinstance(v, str) else v
+                   for v in out["amount"].to_numpy(dtype=object)]
 
             # Convertir a numérico
             out["amount"] = pd.to_numeric(amt, errors="coerce")
 
-        # --- 5) Aplicar signos CORRECTOS y normalizar texto ---
-        if "debit_credit" in out.columns and "amount" in out.columns:
-            # Limpiar y normalizar la columna CARGO/ABONO
-            dc = out["debit_credit"].str.upper().str.strip()
-            dc = dc.replace({"A": "ABONO", "C": "CARGO"})
-
-            # Aplicar signos: CARGO = negativo (-), ABONO = positivo (+)
-            sign_mapping = {"CARGO": -1, "ABONO": 1}
-            signs = dc.map(sign_mapping).fillna(1)  # Default a positivo si no se reconoce
-
-            # CRÍTICO: Aplicar signos a los montos
-            out["amount"] = out["amount"].abs() * signs  # abs() por seguridad, luego aplicar signo correcto
-            out["debit_credit"] = dc
+        # --- 5) Aplicar signos CORRECTOS, normalizar texto y descartar filas sin tipo válido ---
+        if "debit_credit" in out.columns:
+            # Limpiar y normalizar la columna CARGO/ABONO (ya viene sin espacios)
+            dc_arr = out["debit_credit"].str.upper().to_numpy()
+            is_cargo = (dc_arr == "CARGO") | (dc_arr == "C")
+            valid = is_cargo | (dc_arr == "ABONO") | (dc_arr == "A")
+
+            # CRÍTICO: Aplicar signos: CARGO = negativo (-), ABONO = positivo (+)
+            if "amount" in out.columns:
+                vals = out["amount"].to_numpy(copy=True)
+                np.abs(vals, out=vals)  # abs() por seguridad, luego aplicar signo correcto
+                vals[is_cargo] *= -1
+                out["amount"] = vals
+            # Texto canónico desde las mismas máscaras (las filas no válidas se descartan abajo)
+            out["debit_credit"] = pd.Series(np.where(is_cargo, "CARGO", "ABONO"),
+                                            index=out.index, dtype=_TEXT_DTYPE)
+
+            # Eliminar filas sin tipo ABONO/CARGO válido antes del resto del procesamiento
+            out = out[valid]
 
         # --- 6) Procesar fechas ---
+        date_codes = None  # códigos enteros por fecha ISO (-1 = faltante), reutilizados al deduplicar
         if "date" in out.columns:
-            out["date"] = pd.to_datetime(out["date"], errors="coerce", dayfirst=True)
-            # Convertir a string en formato ISO para consistencia
-            out["date"] = out["date"].dt.strftime("%Y-%m-%d")
+            # Las cartolas repiten mucho la misma fecha: parsear y formatear solo los valores únicos
+            codes, uniques = pd.factorize(out["date"])
+            uniques = pd.Series([u.strip() if isinstance(u, str) else u for u in uniques], dtype=object)
+            parsed = pd.to_datetime(uniques, errors="coerce", format=_DATE_FORMATS[0])
+            for fmt in _DATE_FORMATS[1:] + (None,):
+                pending = parsed.isna() & uniques.notna()
+                if not pending.any():
+                    break
+                parsed[pending] = pd.to_datetime(uniques[pending], errors="coerce", format=fmt, dayfirst=True)
+            # Convertir a string en formato ISO para consistencia (código -1 = faltante -> NaN)
+            iso_codes, iso = pd.factorize(parsed.dt.strftime("%Y-%m-%d").to_numpy(dtype=object))
+            date_codes = np.append(iso_codes, -1)[codes]
+            iso = np.append(np.asarray(iso, dtype=object), np.nan)
+            out["date"] = pd.Series(iso[date_codes], index=out.index).astype(_TEXT_DTYPE)
 
         # --- 7) Filtros de limpieza ---
 
-        # 7.1) Eliminar filas sin tipo ABONO/CARGO válido
-        if "debit_credit" in out.columns:
-            out = out[out["debit_credit"].isin(["ABONO", "CARGO"])]
+        # 7.1) Eliminar duplicados exactos (antes de las comisiones: achica la búsqueda por regex)
+        duplicate_cols = ["date", "description", "amount", "debit_credit"]
+        available_cols = [col for col in duplicate_cols if col in out.columns]
+        if date_codes is not None:
+            # La fecha ya está factorizada: hashear enteros en vez de strings
+            keys = out[[c for c in available_cols if c != "date"]].assign(date=date_codes)
+            keep = ~keys.duplicated(keep="first").to_numpy()
+            out, date_codes = out[keep], date_codes[keep]
+        elif available_cols:
+            out = out.drop_duplicates(subset=available_cols, keep="first")
 
         # 7.2) Deduplicación inteligente de COMISIONES
         if len(out) > 0:
-            comisiones_pat = r"(?i)\bcom\.?\s*manten|comisi[oó]n|gastos?\s+bancarios?|cargo[s]?\s+por\s+servicio|mantenci[oó]n"
-            is_commission = out["description"].str.contains(comisiones_pat, na=False)
+            is_commission = out["description"].str.contains(_COMISIONES_RE, na=False)
 
             if is_commission.any():
-                # Normalizar descripción para agrupar
-                desc_norm = (out["description"]
-                             .str.lower()
-                             .str.replace(r"\s+", " ", regex=True)
-                             .str.strip())
-                out = out.assign(_is_comm=is_commission, _desc_norm=desc_norm, _abs=out["amount"].abs())
+                mask = is_commission.to_numpy()
 
-                # Para grupos de comisiones: mantener solo la de mayor |Monto|
-                keep_index = out.index.to_series()
-                grp = out[out["_is_comm"]].groupby(["date", "_desc_norm"], as_index=False)["_abs"].idxmax()
-                idx_keep_comm = set(grp["_abs"].tolist()) if len(grp) > 0 else set()
-                idx_all_comm = set(out[out["_is_comm"]].index.tolist())
-                idx_drop_comm = idx_all_comm - idx_keep_comm
-
-                if idx_drop_comm:
-                    keep_index = keep_index.drop(list(idx_drop_comm), errors="ignore")
-
-                out = out.loc[keep_index].drop(columns=["_is_comm", "_desc_norm", "_abs"], errors="ignore")
+                # Normalizar descripción para agrupar (una sola pasada)
+                desc_norm = [_WS_RE.sub(" ", d.lower()).strip() if isinstance(d, str) else d
+                             for d in out["description"].to_numpy(dtype=object)[mask]]
 
-        # 7.3) Eliminar duplicados exactos
-        duplicate_cols = ["date", "description", "amount", "debit_credit"]
-        available_cols = [col for col in duplicate_cols if col in out.columns]
-        if available_cols:
-            out = out.drop_duplicates(subset=available_cols, keep="first")
-
-        # 7.4) Filtrar filas con datos esenciales faltantes
+                # Para grupos de comisiones: mantener solo la de mayor |Monto|
+                # (claves en un frame auxiliar: out nunca recibe columnas temporales)
+                comm_idx = out.index[mask]
+                keys = pd.DataFrame({
+                    "date": date_codes[mask] if date_codes is not None else out["date"].to_numpy()[mask],
+                    "desc": desc_norm,
+                    "abs": np.abs(out["amount"].to_numpy()[mask]),
+                }, index=comm_idx)
+                keep_idx = (keys.sort_values("abs", ascending=False, kind="stable")
+                            .drop_duplicates(subset=["date", "desc"], keep="first")
+                            .index)
+
+                out = out.drop(comm_idx.difference(keep_idx))
+
+        # 7.3) Filtrar filas con datos esenciales faltantes
         out = out.dropna(subset=["amount"])
         if "date" in out.columns:
             out = out[out["date"].notna() & (out["date"] != "")]
@@ -128,14 +179,20 @@ class SantanderParser(BankStatementParser):
             "debit_credit": "ABONO/CARGO",
         }
 
-        out = out.rename(columns=column_rename)
-
-        # Ordenar columnas
-        final_cols = ["Fecha", "Descripción", "Monto", "ABONO/CARGO"]
-        out = out[[col for col in final_cols if col in out.columns]]
-
-        out = out.reset_index(drop=True)
-        return out
+        # Construir el resultado desde los arrays, con un RangeIndex nuevo
+        # (evita el reset_index sobre un índice no contiguo)
+        final_cols = [c for c in column_rename if c in out.columns]
+        return pd.DataFrame({column_rename[c]: out[c].array for c in final_cols})
+
+    @staticmethod
+    def _empty_result() -> pd.DataFrame:
+        """DataFrame vacío con el esquema de salida de parse()"""
+        return pd.DataFrame({
+            "Fecha": pd.Series(dtype=_TEXT_DTYPE),
+            "Descripción": pd.Series(dtype=_TEXT_DTYPE),
+            "Monto": pd.Series(dtype="float64"),
+            "ABONO/CARGO": pd.Series(dtype=_TEXT_DTYPE),
+        })
 
     def format_for_display(self, df: pd.DataFrame) -> pd.DataFrame:
         """Formatea DataFrame para mostrar en interfaz con formato chileno"""
@@ -146,7 +203,13 @@ class SantanderParser(BankStatementParser):
 
         # Formatear montos con separadores de miles chilenos
         if 'Monto' in display_df.columns:
-            display_df['Monto_Formateado'] = display_df['Monto'].apply(self._format_chilean_currency)
+            if pd.api.types.is_numeric_dtype(display_df['Monto']):
+                amounts = display_df['Monto'].to_numpy(dtype=float)
+                display_df['Monto_Formateado'] = [
+                    (f"-${-v:,.0f}" if v < 0 else f"${v:,.0f}").replace(",", ".") for v in amounts
+                ]
+            else:
+                display_df['Monto_Formateado'] = display_df['Monto'].apply(self._format_chilean_currency)
 
         return display_df
 
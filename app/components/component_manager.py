@@ -5,8 +5,9 @@ from typing import Dict, Any, Optional, Callable, Tuple
 from enum import Enum
 import streamlit as st
 import logging
+import time
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 class ComponentStatus(Enum):
@@ -25,7 +26,7 @@ class ComponentInfo:
     status: ComponentStatus = ComponentStatus.NOT_INITIALIZED
     instance: Any = None
     error_message: str = ""
-    last_check: Optional[datetime] = None
+    last_check_ts: float = 0.0  # time.monotonic() del último chequeo (0 = nunca)
     initialization_attempts: int = 0
     max_attempts: int = 3
     is_critical: bool = True
@@ -37,6 +38,8 @@ class ComponentManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.components: Dict[str, ComponentInfo] = {}
+        # Ruta rápida: (instancia, estado, last_check_ts) de componentes listos
+        self._fast_cache: Dict[str, Tuple[Any, ComponentStatus, float]] = {}
         self._setup_component_definitions()
 
     def _setup_component_definitions(self):
@@ -70,6 +73,9 @@ class ComponentManager:
 
     def get_component(self, name: str, auto_initialize: bool = True) -> Tuple[Any, ComponentStatus]:
         """Obtiene un componente, inicializándolo si es necesario"""
+        cached = self._fast_cache.get(name)
+        if cached is not None and time.monotonic() - cached[2] <= 300:
+            return cached[0], cached[1]
 
         # Si no existe, crear info del componente
         if name not in self.components:
@@ -97,10 +103,15 @@ class ComponentManager:
         if component_info.status != ComponentStatus.READY and auto_initialize:
             self._initialize_component(name)
 
+        if component_info.status == ComponentStatus.READY and component_info.instance:
+            self._fast_cache[name] = (component_info.instance, component_info.status,
+                                      component_info.last_check_ts)
+
         return component_info.instance, component_info.status
 
     def _initialize_component(self, name: str):
         """Inicializa un componente específico"""
+        self._fast_cache.pop(name, None)
         component_info = self.components[name]
         definition = self.component_definitions.get(name)
 
@@ -118,7 +129,7 @@ class ComponentManager:
 
         component_info.status = ComponentStatus.INITIALIZING
         component_info.initialization_attempts += 1
-        component_info.last_check = datetime.now()
+        component_info.last_check_ts = time.monotonic()
 
         try:
             self.logger.info(f"🔧 Inicializando componente: {name}")
@@ -152,12 +163,11 @@ class ComponentManager:
 
     def _should_check_health(self, component_info: ComponentInfo) -> bool:
         """Determina si es momento de verificar la salud del componente"""
-        if not component_info.last_check:
+        if not component_info.last_check_ts:
             return True
 
         # Verificar cada 5 minutos
-        time_since_check = datetime.now() - component_info.last_check
-        return time_since_check.total_seconds() > 300
+        return time.monotonic() - component_info.last_check_ts > 300
 
     def _check_component_health(self, name: str) -> bool:
         """Verifica la salud de un componente"""
@@ -171,7 +181,7 @@ class ComponentManager:
             health_check = definition.get('health_check')
             if health_check:
                 result = health_check(component_info.instance)
-                component_info.last_check = datetime.now()
+                component_info.last_check_ts = time.monotonic()
                 return result
             return True
         except Exception as e:
@@ -180,6 +190,7 @@ class ComponentManager:
 
     def force_reinitialize(self, name: str):
         """Fuerza la reinicialización de un componente"""
+        self._fast_cache.pop(name, None)
         if name in self.components:
             component_info = self.components[name]
             component_info.status = ComponentStatus.NOT_INITIALIZED
@@ -189,6 +200,14 @@ class ComponentManager:
 
         self._initialize_component(name)
 
+    @staticmethod
+    def last_check_iso(info: ComponentInfo) -> Optional[str]:
+        """Fecha/hora (ISO) del último chequeo, derivada del reloj monotónico"""
+        if not info.last_check_ts:
+            return None
+        elapsed = time.monotonic() - info.last_check_ts
+        return (datetime.now() - timedelta(seconds=elapsed)).isoformat()
+
     def get_system_status(self) -> Dict:
         """Obtiene estado completo del sistema"""
         status = {
@@ -205,7 +224,7 @@ class ComponentManager:
                 'is_critical': info.is_critical,
                 'error_message': info.error_message,
                 'attempts': info.initialization_attempts,
-                'last_check': info.last_check.isoformat() if info.last_check else None
+                'last_check': self.last_check_iso(info)
             }
 
             if info.status == ComponentStatus.READY:
@@ -258,27 +277,16 @@ class ComponentManager:
 
     def _check_parser_health(self, parser) -> bool:
         """Verifica salud del Parser"""
-        try:
-            # Test básico con DataFrame vacío
-            import pandas as pd
-            test_df = pd.DataFrame()
-            return hasattr(parser, 'parse')
-        except:
-            return False
+        return hasattr(type(parser), 'parse')
 
     def _check_classifier_health(self, classifier) -> bool:
         """Verifica salud del Classifier"""
-        try:
-            return hasattr(classifier, 'fit') and hasattr(classifier, 'predict')
-        except:
-            return False
+        cls = type(classifier)
+        return hasattr(cls, 'fit') and hasattr(cls, 'predict')
 
     def _check_kame_health(self, kame) -> bool:
         """Verifica salud del KameIntegrator"""
-        try:
-            return hasattr(kame, 'load')
-        except:
-            return False
+        return hasattr(type(kame), 'load')
 
 
 # === INTEGRACIÓN CON STREAMLIT ===
@@ -383,5 +391,5 @@ def handle_component_error(component_name: str, error: Exception, fallback_fn: C
                 'status': component_info.status.value,
                 'attempts': component_info.initialization_attempts,
                 'is_critical': component_info.is_critical,
-                'last_check': component_info.last_check.isoformat() if component_info.last_check else None
+                'last_check': manager.last_check_iso(component_info)
             })
\ No newline at end of file
@@ -1,6 +1,7 @@
 # config/environments.py
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any
 
 @dataclass
@@ -37,7 +38,9 @@ config_map = {
     'production': ProductionConfig
 }
 
+@lru_cache(maxsize=1)
 def get_config() -> BaseConfig:
+    # Una sola instancia por proceso (get_config.cache_clear() para recargar)
     env = os.getenv('APP_ENV', 'development')
     config_class = config_map.get(env, DevelopmentConfig)
     return config_class()
\ No newline at end of file
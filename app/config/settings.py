@@ -1,14 +1,28 @@
 # config/settings.py - Sistema de configuración centralizado
 from __future__ import annotations
 import os
+import copy
 import json
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field, fields, is_dataclass, replace, MISSING
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+try:
+    import orjson  # Parser/serializador JSON nativo, opcional
+except ImportError:
+    orjson = None
 
-@dataclass
+# Defaults inmutables: se comparten entre instancias sin default_factory
+_FILE_TYPES: Tuple[str, ...] = ('.xlsx', '.xls', '.csv')
+_DEFAULT_CATEGORIES: Tuple[str, ...] = (
+    "Alimentación", "Combustible", "Servicios", "Transporte",
+    "Salud", "Educación", "Entretenimiento", "Vestuario",
+    "Hogar", "Tecnología", "Bancario", "Impuestos", "Otros"
+)
+
+
+@dataclass(slots=True)
 class DatabaseConfig:
     """Configuración de base de datos"""
     db_path: str = "data/finance.db"
@@ -18,7 +32,7 @@ class DatabaseConfig:
     max_connections: int = 10
 
 
-@dataclass
+@dataclass(slots=True)
 class MLConfig:
     """Configuración de Machine Learning"""
     test_size: float = 0.2
@@ -31,18 +45,18 @@ class MLConfig:
     model_path: str = "models/expense_classifier.pkl"
 
 
-@dataclass
+@dataclass(slots=True)
 class KameConfig:
     """Configuración de integración KAME"""
     date_tolerance_days: int = 5
     amount_tolerance_pct: float = 0.05  # 5%
     enable_vendor_matching: bool = True
     vendor_similarity_threshold: float = 0.7
-    supported_formats: List[str] = field(default_factory=lambda: ['.xlsx', '.xls', '.csv'])
+    supported_formats: Tuple[str, ...] = _FILE_TYPES
     max_file_size_mb: int = 50
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UIConfig:
     """Configuración de interfaz de usuario"""
     page_title: str = "Santander Finance App"
@@ -55,18 +69,18 @@ class UIConfig:
     number_format: str = ",.0f"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SecurityConfig:
     """Configuración de seguridad"""
     enable_auth: bool = False
     password_hash: Optional[str] = None
     session_timeout_minutes: int = 60
     max_file_size_mb: int = 100
-    allowed_file_types: List[str] = field(default_factory=lambda: ['.xlsx', '.xls', '.csv'])
+    allowed_file_types: Tuple[str, ...] = _FILE_TYPES
     enable_rate_limiting: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LoggingConfig:
     """Configuración de logging"""
     level: str = "INFO"
@@ -77,7 +91,7 @@ class LoggingConfig:
     enable_console: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """Configuración principal de la aplicación"""
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
@@ -95,11 +109,7 @@ class AppConfig:
     backups_dir: str = "backups"
 
     # Categories
-    default_categories: List[str] = field(default_factory=lambda: [
-        "Alimentación", "Combustible", "Servicios", "Transporte",
-        "Salud", "Educación", "Entretenimiento", "Vestuario",
-        "Hogar", "Tecnología", "Bancario", "Impuestos", "Otros"
-    ])
+    default_categories: Tuple[str, ...] = _DEFAULT_CATEGORIES
 
     # Performance
     max_rows_display: int = 1000
@@ -107,6 +117,125 @@ class AppConfig:
     enable_caching: bool = True
     cache_ttl_minutes: int = 30
 
+    @classmethod
+    def _fast_from_dict(cls, data: Dict[str, Any]) -> AppConfig:
+        """Construye la configuración desde el JSON sin pasar por __init__"""
+        obj = object.__new__(cls)
+        for name, section_cls, default, factory in _APP_FIELDS:
+            if name in data:
+                value = (section_cls(**_as_tuples(data[name], _SECTION_TUPLE_FIELDS[name]))
+                         if section_cls is not None else _as_tuple(name, data[name]))
+            elif factory is not None:
+                value = factory()
+            else:
+                value = default
+            object.__setattr__(obj, name, value)
+        return obj
+
+
+# (campo, clase de sección o None, default, default_factory) de AppConfig
+_APP_FIELDS = tuple(
+    (f.name,
+     f.default_factory if is_dataclass(f.default_factory) else None,
+     f.default,
+     f.default_factory if f.default_factory is not MISSING else None)
+    for f in fields(AppConfig)
+)
+_SECTION_CLASSES = {name: section_cls for name, section_cls, _, _ in _APP_FIELDS if section_cls is not None}
+_SIMPLE_FIELDS = frozenset(name for name, section_cls, _, _ in _APP_FIELDS if section_cls is None)
+# Campos anotados como tupla: el JSON los trae como listas y se convierten al cargar,
+# así una config leída del archivo es igual (y hashable) a la de defaults
+def _is_tuple_type(annotation: str) -> bool:
+    return annotation == 'tuple' or annotation.startswith('Tuple[')
+
+
+_SECTION_TUPLE_FIELDS = {
+    name: frozenset(f.name for f in fields(section_cls) if _is_tuple_type(f.type))
+    for name, section_cls in _SECTION_CLASSES.items()
+}
+_TUPLE_FIELDS = frozenset(f.name for f in fields(AppConfig) if _is_tuple_type(f.type))
+
+
+def _as_tuple(name: str, value: Any) -> Any:
+    return tuple(value) if name in _TUPLE_FIELDS and isinstance(value, list) else value
+
+
+def _as_tuples(values: Dict[str, Any], tuple_fields: frozenset) -> Dict[str, Any]:
+    if not tuple_fields & values.keys():
+        return values
+    return {key: tuple(value) if key in tuple_fields and isinstance(value, list) else value
+            for key, value in values.items()}
+
+
+# (campo, campos de la sección o None) en el orden de AppConfig, para serializar
+_DICT_LAYOUT = tuple(
+    (name, tuple(f.name for f in fields(section_cls)) if section_cls is not None else None)
+    for name, section_cls, _, _ in _APP_FIELDS
+)
+
+
+def _config_to_dict(config: AppConfig) -> Dict[str, Any]:
+    """Equivalente de asdict() a dos niveles, sin recursión ni deepcopy"""
+    data = {}
+    for name, section_fields in _DICT_LAYOUT:
+        value = getattr(config, name)
+        if section_fields is not None:
+            value = {attr: getattr(value, attr) for attr in section_fields}
+        data[name] = value
+    return data
+
+
+def _json_loads(data: bytes) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+_TRUTHY = frozenset({'true', '1', 'yes', 'on', 't', 'y'})
+
+
+def _to_bool(value: str) -> bool:
+    # Cualquier valor no reconocido es False (p. ej. ENABLE_AUTH=disabled)
+    return value.strip().lower() in _TRUTHY
+
+
+# Conversión según el tipo declarado del campo (anotaciones en texto por __future__)
+_COERCERS = {'bool': _to_bool, 'int': int, 'float': float}
+_FIELD_TYPES = {
+    (name, f.name): f.type
+    for name, section_cls in _SECTION_CLASSES.items()
+    for f in fields(section_cls)
+}
+
+# Variable de entorno -> (sección, campo, conversión), resuelto una sola vez
+_ENV_COERCE = {
+    env_var: (section, attr, _COERCERS.get(_FIELD_TYPES[section, attr], str))
+    for env_var, (section, attr) in {
+        'DB_PATH': ('database', 'db_path'),
+        'ML_TEST_SIZE': ('ml', 'test_size'),
+        'ML_MAX_FEATURES': ('ml', 'max_features'),
+        'KAME_DATE_TOLERANCE': ('kame', 'date_tolerance_days'),
+        'KAME_AMOUNT_TOLERANCE': ('kame', 'amount_tolerance_pct'),
+        'APP_PASSWORD': ('security', 'password_hash'),
+        'LOG_LEVEL': ('logging', 'level'),
+        'ENABLE_AUTH': ('security', 'enable_auth'),
+    }.items()
+}
+
+
+# Nombre de nivel -> valor numérico (getLevelNamesMapping existe desde 3.11)
+_LEVELS = (logging.getLevelNamesMapping() if hasattr(logging, 'getLevelNamesMapping')
+           else dict(logging._nameToLevel))
+
+# Configuración ya parseada por archivo: ruta -> ((mtime_ns, tamaño), AppConfig)
+_JSON_CACHE: Dict[str, tuple] = {}
+
 
 class ConfigManager:
     """Gestor de configuración con carga desde archivo y variables de entorno"""
@@ -120,14 +249,21 @@ class ConfigManager:
         """Carga configuración desde archivo y variables de entorno"""
         config = AppConfig()
 
-        # Load from JSON file if exists
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    json_config = json.load(f)
-                config = self._merge_config(config, json_config)
-            except Exception as e:
-                logging.warning(f"Could not load config file: {e}")
+        # Load from JSON file if exists (sin exists() previo: un stat menos, sin carrera)
+        try:
+            stat = self.config_path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = _JSON_CACHE.get(str(self.config_path))
+            if cached is None or cached[0] != stamp:
+                json_config = _json_loads(self.config_path.read_bytes())
+                cached = (stamp, AppConfig._fast_from_dict(json_config))
+                _JSON_CACHE[str(self.config_path)] = cached
+            # Copia: los overrides de entorno y update_config mutan la instancia
+            config = copy.deepcopy(cached[1])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Could not load config file: {e}")
 
         # Override with environment variables
         config = self._load_env_overrides(config)
@@ -138,28 +274,16 @@ class ConfigManager:
         return config
 
     def _merge_config(self, config: AppConfig, json_data: Dict[str, Any]) -> AppConfig:
-        """Mezcla configuración JSON con configuración por defecto"""
+        """Mezcla configuración JSON con la configuración actual"""
         try:
-            # Convert JSON to dataclass
-            if 'database' in json_data:
-                config.database = DatabaseConfig(**json_data['database'])
-            if 'ml' in json_data:
-                config.ml = MLConfig(**json_data['ml'])
-            if 'kame' in json_data:
-                config.kame = KameConfig(**json_data['kame'])
-            if 'ui' in json_data:
-                config.ui = UIConfig(**json_data['ui'])
-            if 'security' in json_data:
-                config.security = SecurityConfig(**json_data['security'])
-            if 'logging' in json_data:
-                config.logging = LoggingConfig(**json_data['logging'])
+            # Secciones: solo se cambian las claves presentes, el resto se conserva
+            for name in _SECTION_CLASSES.keys() & json_data.keys():
+                section_data = _as_tuples(json_data[name], _SECTION_TUPLE_FIELDS[name])
+                setattr(config, name, replace(getattr(config, name), **section_data))
 
             # Simple fields
-            for field_name in ['data_dir', 'uploads_dir', 'models_dir', 'logs_dir',
-                               'backups_dir', 'default_categories', 'max_rows_display',
-                               'chunk_size', 'enable_caching', 'cache_ttl_minutes']:
-                if field_name in json_data:
-                    setattr(config, field_name, json_data[field_name])
+            for name in _SIMPLE_FIELDS & json_data.keys():
+                setattr(config, name, _as_tuple(name, json_data[name]))
 
         except Exception as e:
             logging.warning(f"Error merging config: {e}")
@@ -168,33 +292,15 @@ class ConfigManager:
 
     def _load_env_overrides(self, config: AppConfig) -> AppConfig:
         """Carga overrides desde variables de entorno"""
-        env_mapping = {
-            'DB_PATH': ('database', 'db_path'),
-            'ML_TEST_SIZE': ('ml', 'test_size'),
-            'ML_MAX_FEATURES': ('ml', 'max_features'),
-            'KAME_DATE_TOLERANCE': ('kame', 'date_tolerance_days'),
-            'KAME_AMOUNT_TOLERANCE': ('kame', 'amount_tolerance_pct'),
-            'APP_PASSWORD': ('security', 'password_hash'),
-            'LOG_LEVEL': ('logging', 'level'),
-            'ENABLE_AUTH': ('security', 'enable_auth'),
-        }
+        env = os.environ
 
-        for env_var, (section, field) in env_mapping.items():
-            value = os.getenv(env_var)
+        for env_var, (section, attr, coerce) in _ENV_COERCE.items():
+            value = env.get(env_var)
             if value is not None:
                 try:
-                    section_obj = getattr(config, section)
-
-                    # Type conversion
-                    field_type = type(getattr(section_obj, field))
-                    if field_type == bool:
-                        value = value.lower() in ('true', '1', 'yes', 'on')
-                    elif field_type == int:
-                        value = int(value)
-                    elif field_type == float:
-                        value = float(value)
-
-                    setattr(section_obj, field, value)
+                    # replace(): algunas secciones son inmutables (frozen)
+                    section_obj = replace(getattr(config, section), **{attr: coerce(value)})
+                    setattr(config, section, section_obj)
                 except Exception as e:
                     logging.warning(f"Could not set {env_var}: {e}")
 
@@ -202,23 +308,38 @@ class ConfigManager:
 
     def _create_directories(self, config: AppConfig):
         """Crea directorios necesarios"""
-        directories = [
-            config.data_dir,
-            config.uploads_dir,
-            config.models_dir,
-            config.logs_dir,
-            config.backups_dir,
-        ]
+        directories = {
+            os.path.normpath(directory) for directory in (
+                config.data_dir,
+                config.uploads_dir,
+                config.models_dir,
+                config.logs_dir,
+                config.backups_dir,
+                os.path.dirname(config.logging.file_path) or '.',
+            )
+        }
 
-        for directory in directories:
-            Path(directory).mkdir(parents=True, exist_ok=True)
+        # Solo los más profundos: makedirs crea los ancestros de paso
+        leaves: List[str] = []
+        for directory in sorted(directories, key=len, reverse=True):
+            if not any(leaf.startswith(directory + os.sep) for leaf in leaves):
+                leaves.append(directory)
+
+        for directory in leaves:
+            os.makedirs(directory, exist_ok=True)
 
     def _setup_logging(self):
         """Configura el sistema de logging"""
         log_config = self.config.logging
 
-        # Create logs directory
-        Path(log_config.file_path).parent.mkdir(parents=True, exist_ok=True)
+        # Idempotente: la clave vive en el root logger, así sobrevive a reimports
+        root = logging.getLogger()
+        logging_key = (log_config.level, log_config.format, log_config.file_path,
+                       log_config.max_file_size_mb, log_config.backup_count,
+                       log_config.enable_console)
+        previous_key = getattr(root, '_app_logging_key', None)
+        if previous_key == logging_key:
+            return
 
         # Configure logging
         handlers = []
@@ -228,7 +349,9 @@ class ConfigManager:
         file_handler = RotatingFileHandler(
             log_config.file_path,
             maxBytes=log_config.max_file_size_mb * 1024 * 1024,
-            backupCount=log_config.backup_count
+            backupCount=log_config.backup_count,
+            encoding='utf-8',
+            delay=True  # El archivo se abre con el primer registro
         )
         file_handler.setFormatter(logging.Formatter(log_config.format))
         handlers.append(file_handler)
@@ -241,19 +364,28 @@ class ConfigManager:
 
         # Configure root logger
         logging.basicConfig(
-            level=getattr(logging, log_config.level.upper()),
+            level=_LEVELS.get(log_config.level.upper(), logging.INFO),
             handlers=handlers,
-            format=log_config.format
+            format=log_config.format,
+            force=previous_key is not None
         )
+        root._app_logging_key = logging_key
 
     def save_config(self):
         """Guarda configuración actual a archivo"""
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            config_dict = asdict(self.config)
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config_dict, f, indent=2, ensure_ascii=False)
+            config_dict = _config_to_dict(self.config)
+            data = _json_dumps(config_dict)
+
+            # Escritura atómica: temporal + fsync + os.replace, nunca queda a medias
+            tmp_path = self.config_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
         except Exception as e:
             logging.error(f"Could not save config: {e}")
 
@@ -270,6 +402,22 @@ class ConfigManager:
             logging.error(f"Could not update config: {e}")
 
 
-# Global config instance
-config_manager = ConfigManager()
-config = config_manager.get_config()
\ No newline at end of file
+# Global config instance (perezosa: se crea en el primer acceso)
+_config_manager: Optional[ConfigManager] = None
+
+
+def get_config_manager() -> ConfigManager:
+    """Obtiene el ConfigManager global, creándolo la primera vez"""
+    global _config_manager
+    if _config_manager is None:
+        _config_manager = ConfigManager()
+    return _config_manager
+
+
+def __getattr__(name: str):
+    # PEP 562: settings.config / settings.config_manager siguen disponibles
+    if name == 'config_manager':
+        return get_config_manager()
+    if name == 'config':
+        return get_config_manager().get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,10 @@
 # app/config/simple_config.py - Configuración básica funcional
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """Configuración simple de la aplicación"""
 
@@ -31,22 +31,19 @@ class AppConfig:
     date_format: str = "%d/%m/%Y"
 
     # Categories
-    default_categories: List[str] = None
+    default_categories: List[str] = field(default_factory=lambda: [
+        "bordados",
+        "contabilidad",
+        "servicios",
+        "combustible",
+        "alimentacion",
+        "tecnologia",
+        "bancario",
+        "impuestos",
+        "otros"
+    ])
 
     def __post_init__(self):
-        if self.default_categories is None:
-            self.default_categories = [
-                "bordados",
-                "contabilidad",
-                "servicios",
-                "combustible",
-                "alimentacion",
-                "tecnologia",
-                "bancario",
-                "impuestos",
-                "otros"
-            ]
-
         # Crear directorios
         self.create_directories()
 
@@ -1,17 +1,97 @@
 # app/contacts/contacts_manager.py - Sistema completo de gestión de contactos
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple, Optional, Union
 import streamlit as st
 import logging
 from datetime import datetime
+import atexit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from utils.io import read_excel_fast
+
+# Separadores de RUT: '.', '-' y cualquier carácter con str.isspace()
+_RUT_WHITESPACE = ''.join(chr(c) for c in range(0x3001) if chr(c).isspace())
+
+# Camino escalar: str.translate los elimina sin pasar por el motor de regex
+_RUT_STRIP_TABLE = str.maketrans('', '', '.-' + _RUT_WHITESPACE)
+
+# Camino vectorizado: la misma clase de caracteres, escrita literal (\s en RE2 es solo ASCII)
+_RUT_SEPARATORS = '[.' + _RUT_WHITESPACE + '-]'
+
+# Dígitos verificadores válidos
+_VALID_DVS = frozenset('0123456789K')
+
+# Máximo de filas que trae la lista de contactos cuando hay filtros activos
+_CONTACTS_LIST_LIMIT = 200
+
+# Hilos para parsear Excel de contactos mientras el script de Streamlit refresca el progreso
+# (los hilos se crean al primer submit)
+_excel_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='contacts-excel')
+atexit.register(_excel_executor.shutdown, wait=False, cancel_futures=True)
+
+# Cada cuánto se refresca la barra de progreso mientras se parsea (segundos)
+_PROGRESS_INTERVAL = 0.25
+
+
+def _load_contacts_excel_in_background(contacts_manager, file_path: Path,
+                                       progress_bar=None) -> Tuple[pd.DataFrame, Dict]:
+    """Parsea el Excel en un hilo aparte; los errores del parseo se propagan tal cual"""
+    # El hilo trabajador solo anota la etapa; los elementos de Streamlit se tocan desde el script
+    state = [0.0, "Leyendo archivo..."]
+
+    def report(fraction: float, text: str):
+        state[:] = (fraction, text)
+
+    future = _excel_executor.submit(contacts_manager.load_contacts_from_excel, file_path, report)
+    while True:
+        try:
+            return future.result(timeout=_PROGRESS_INTERVAL)
+        except FutureTimeoutError:
+            if progress_bar is not None:
+                progress_bar.progress(state[0], text=state[1])
+
+
+# Dtype de texto respaldado por Arrow (con NaN como faltante) si pyarrow está disponible
+try:
+    import pyarrow  # noqa: F401
+    try:
+        _TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:  # pandas < 2.3
+        _TEXT_DTYPE = "string[pyarrow_numpy]"
+except ImportError:
+    _TEXT_DTYPE = str
+
+# Índices de contactos por base de datos:
+# db_path -> (data_version, rut_to_contact, códigos int64 de RUT, descripciones ya mejoradas)
+_rut_index_cache: Dict[str, Tuple] = {}
+
+# Tope de descripciones memorizadas por versión de la base
+_MAX_ENHANCED_MEMO = 200_000
 
 
 class ContactsManager:
     """Gestor completo de contactos con carga desde Excel y mejora de descripciones"""
 
+    # Patrones compilados una sola vez
+    _RUT_FIND_RE = re.compile(
+        r'\b(\d{1,2}\.?\d{3}\.?\d{3}[-.]?[0-9kK])\b'  # Formato completo
+        r'|\b(\d{7,8}[-.]?[0-9kK])\b',  # Formato sin puntos
+        re.IGNORECASE
+    )
+    _RUT_LIKE_RE = re.compile(
+        r'\d{7,8}[-.]?[0-9kK]'  # Formato básico: 12345678-9 o 12345678K
+        r'|\d{1,2}\.\d{3}\.\d{3}[-.]?[0-9kK]'  # Formato con puntos: 12.345.678-9
+        r'|^\d{7,8}[0-9kK]$',  # Sin separadores: 123456789
+        re.IGNORECASE
+    )
+    _HAS_LETTER_RE = re.compile(r'[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ]')
+    _ONLY_DIGITS_RE = re.compile(r'^\d+$')
+    _ONLY_NUMERIC_SYMBOLS_RE = re.compile(r'^[0-9.-]+$')
+
     def __init__(self, datastore):
         self.datastore = datastore
         self.logger = logging.getLogger(__name__)
@@ -21,11 +101,20 @@ class ContactsManager:
         if not rut or pd.isna(rut):
             return ""
 
+        # Camino rápido: RUT sin separadores de 8 o 9 caracteres (7-8 dígitos + DV)
+        if isinstance(rut, str) and len(rut) in (8, 9) and rut[-1] in '0123456789kK':
+            number = rut[:-1]
+            if number.isascii() and number.isdigit() and number[0] != '0':
+                digit = rut[-1].upper()
+                if len(number) == 8:
+                    return f"{number[:2]}.{number[2:5]}.{number[5:]}-{digit}"
+                return f"{number[0]}.{number[1:4]}.{number[4:]}-{digit}"
+
         # Convertir a string y limpiar
         rut_clean = str(rut).strip().upper()
 
         # Remover puntos, guiones, espacios
-        rut_clean = re.sub(r'[.\s-]', '', rut_clean)
+        rut_clean = rut_clean.translate(_RUT_STRIP_TABLE)
 
         # Formato estándar: XXXXXXXX-X
         if len(rut_clean) >= 8:
@@ -47,7 +136,7 @@ class ContactsManager:
             return False
 
         # Limpiar RUT
-        rut_clean = re.sub(r'[.\s-]', '', str(rut).strip())
+        rut_clean = str(rut).strip().translate(_RUT_STRIP_TABLE)
 
         # Debe tener al menos 8 caracteres (7 números + 1 dígito verificador)
         if len(rut_clean) < 8:
@@ -60,48 +149,66 @@ class ContactsManager:
         if not number_part.isdigit():
             return False
 
-        if digit_part not in '0123456789K':
+        if digit_part not in _VALID_DVS:
             return False
 
         return True
 
-    def load_contacts_from_excel(self, file_path: Union[str, Path]) -> Tuple[pd.DataFrame, Dict]:
-        """Carga contactos desde archivo Excel del banco"""
+    def _clean_rut_series(self, ruts: pd.Series) -> pd.Series:
+        """Versión vectorizada de clean_rut para columnas completas"""
+        clean = ruts.fillna('').astype(str).str.upper().str.replace(_RUT_SEPARATORS, '', regex=True)
+        number = clean.str[:-1]
+        digit = clean.str[-1]
+
+        # XX.XXX.XXX-X si el número es numérico (sin ceros a la izquierda, como int())
+        digits = number.str.lstrip('0').replace('', '0')
+        # Miles con punto: invertir, agrupar de a 3 y volver a invertir (sin lookahead,
+        # que obligaría a caer al motor de regex de Python fila por fila)
+        thousands = digits.str[::-1].str.replace(r'(\d{3})', r'\1.', regex=True).str.rstrip('.').str[::-1]
+        formatted = thousands + '-' + digit
+        with_dash = number + '-' + digit
+
+        long_enough = clean.str.len() >= 8
+        numeric = number.str.isdigit().fillna(False).astype(bool)
+        return clean.where(~long_enough, with_dash.where(~numeric, formatted))
+
+    def _validate_rut_series(self, ruts: pd.Series) -> pd.Series:
+        """Versión vectorizada de validate_rut para columnas completas"""
+        clean = ruts.fillna('').astype(str).str.replace(_RUT_SEPARATORS, '', regex=True)
+        valid = (
+            (clean.str.len() >= 8) &
+            clean.str[:-1].str.isdigit() &
+            clean.str[-1].str.upper().isin(list('0123456789K'))
+        )
+        return valid.fillna(False).astype(bool)
+
+    def load_contacts_from_excel(self, file_path: Union[str, Path],
+                                 progress: Optional[Callable[[float, str], None]] = None) -> Tuple[pd.DataFrame, Dict]:
+        """Carga contactos desde archivo Excel del banco (progress recibe fracción y etapa)"""
         file_path = Path(file_path)
+        report = progress or (lambda fraction, text: None)
 
         if not file_path.exists():
             raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
 
         try:
-            # Leer el archivo completo sin headers para analizar la estructura
-            df_raw_no_header = pd.read_excel(file_path, dtype=str, header=None)
+            report(0.05, "Buscando encabezados...")
+            # Leer sin headers solo las filas que revisa _find_header_row_advanced
+            df_raw_no_header = read_excel_fast(file_path, dtype=str, header=None, nrows=15)
 
-            self.logger.info(f"Excel cargado sin headers: {len(df_raw_no_header)} filas")
+            self.logger.info(f"Excel cargado sin headers: {len(df_raw_no_header)} filas de muestra")
 
             # Buscar la fila que contiene los headers reales
             header_row = self._find_header_row_advanced(df_raw_no_header)
 
             if header_row is not None:
                 self.logger.info(f"Headers encontrados en fila: {header_row}")
-                # Leer nuevamente con la fila correcta como header
-                df_raw = pd.read_excel(file_path, dtype=str, header=header_row)
             else:
                 # Fallback: intentar leer normalmente
-                df_raw = pd.read_excel(file_path, dtype=str, header=0)
-
-            self.logger.info(f"Columnas detectadas: {list(df_raw.columns)}")
-
-            # Detectar automáticamente columnas de RUT y nombre específicas para transferencias bancarias
-            rut_col, name_col = self._detect_bank_transfer_columns(df_raw)
+                header_row = 0
 
-            if not rut_col or not name_col:
-                # Fallback a detección genérica
-                rut_col, name_col = self._detect_rut_and_name_columns(df_raw)
-
-            # Último intento: si las columnas son genéricas como "Histórico de Transferencias.X"
-            # intentar encontrar las columnas por posición basándose en patrones conocidos
-            if not rut_col or not name_col:
-                rut_col, name_col = self._detect_columns_by_content_analysis(df_raw)
+            # Detectar columnas sobre una muestra; del archivo completo solo se leen esas dos
+            rut_col, name_col, columns = self._detect_columns_fast(file_path, header_row)
 
             if not rut_col or not name_col:
                 # Último intento: mostrar filas de muestra para debug
@@ -109,26 +216,34 @@ class ContactsManager:
                 for i in range(min(5, len(df_raw_no_header))):
                     sample_rows.append(f"Fila {i}: {list(df_raw_no_header.iloc[i].dropna())}")
 
-                available_columns = list(df_raw.columns)
                 error_msg = (
                         f"No se pudieron detectar columnas de RUT y nombre automáticamente.\n"
-                        f"Columnas disponibles: {available_columns}\n"
+                        f"Columnas disponibles: {columns}\n"
                         f"Primeras filas del archivo:\n" + "\n".join(sample_rows[:3]) +
                         f"\nBusque columnas que contengan 'Rut Titular Destino' y 'Nombre Titular Destino'."
                 )
                 raise ValueError(error_msg)
 
+            report(0.2, "Leyendo columnas de RUT y nombre...")
+            usecols = sorted({columns.index(rut_col), columns.index(name_col)})
+            df_raw = read_excel_fast(file_path, dtype=str, header=header_row, usecols=usecols)
+            # Mantener los nombres de la muestra (pandas renombra duplicados según las columnas leídas)
+            df_raw.columns = [columns[i] for i in usecols]
+
             # Extraer y limpiar datos
-            df_contacts = pd.DataFrame()
-            df_contacts['rut_original'] = df_raw[rut_col].astype(str)
-            df_contacts['nombre_original'] = df_raw[name_col].astype(str)
+            # Celdas vacías como '' (se descartan en el filtro) y texto en Arrow
+            df_contacts = pd.DataFrame({
+                'rut_original': df_raw[rut_col].fillna('').astype(_TEXT_DTYPE),
+                'nombre_original': df_raw[name_col].fillna('').astype(_TEXT_DTYPE),
+            })
 
             # Limpiar RUTs
-            df_contacts['rut'] = df_contacts['rut_original'].apply(self.clean_rut)
+            report(0.7, f"Validando {len(df_contacts):,} filas...")
+            df_contacts['rut'] = self._clean_rut_series(df_contacts['rut_original'])
             df_contacts['nombre'] = df_contacts['nombre_original'].str.strip().str.title()
 
             # Filtrar RUTs válidos y nombres no vacíos
-            df_contacts['rut_valido'] = df_contacts['rut'].apply(self.validate_rut)
+            df_contacts['rut_valido'] = self._validate_rut_series(df_contacts['rut'])
             df_valid = df_contacts[
                 df_contacts['rut_valido'] &
                 (df_contacts['nombre'] != '') &
@@ -140,7 +255,8 @@ class ContactsManager:
             df_unique = df_valid.drop_duplicates(subset=['rut'], keep='first')
 
             # Generar alias automático (primer nombre + primer apellido)
-            df_unique['alias'] = df_unique['nombre'].apply(self._generate_alias)
+            report(0.9, "Generando alias...")
+            df_unique['alias'] = self._generate_alias_series(df_unique['nombre'])
 
             # Estadísticas de procesamiento
             stats = {
@@ -163,6 +279,27 @@ class ContactsManager:
             self.logger.error(f"Error cargando contactos desde Excel: {e}")
             raise
 
+    def _detect_columns_fast(self, file_path: Path, header_row: int) -> Tuple[Optional[str], Optional[str], List]:
+        """Detecta las columnas de RUT y nombre leyendo solo las primeras filas del archivo"""
+        df_head = read_excel_fast(file_path, dtype=str, header=header_row, nrows=100)
+        columns = list(df_head.columns)
+
+        self.logger.info(f"Columnas detectadas: {columns}")
+
+        # Detectar automáticamente columnas de RUT y nombre específicas para transferencias bancarias
+        rut_col, name_col = self._detect_bank_transfer_columns(df_head)
+
+        if not rut_col or not name_col:
+            # Fallback a detección genérica
+            rut_col, name_col = self._detect_rut_and_name_columns(df_head)
+
+        # Último intento: si las columnas son genéricas como "Histórico de Transferencias.X"
+        # intentar encontrar las columnas por posición basándose en patrones conocidos
+        if not rut_col or not name_col:
+            rut_col, name_col = self._detect_columns_by_content_analysis(df_head)
+
+        return rut_col, name_col, columns
+
     def _find_header_row_advanced(self, df: pd.DataFrame) -> Optional[int]:
         """Busca la fila que contiene los encabezados de columnas de manera avanzada"""
         for i in range(min(15, len(df))):  # Buscar en las primeras 15 filas
@@ -347,15 +484,9 @@ class ContactsManager:
             total_valid_entries += 1
 
             # Buscar patrones que parezcan RUTs (más flexibles y específicos)
-            patterns = [
-                r'\d{7,8}[-.]?[0-9kK]',  # Formato básico: 12345678-9 o 12345678K
-                r'\d{1,2}\.\d{3}\.\d{3}[-.]?[0-9kK]',  # Formato con puntos: 12.345.678-9
-                r'^\d{7,8}[0-9kK]$',  # Sin separadores: 123456789
-            ]
-
-            if any(re.search(pattern, value_str, re.IGNORECASE) for pattern in patterns):
+            if self._RUT_LIKE_RE.search(value_str):
                 # Verificación adicional: debe tener longitud apropiada
-                clean_value = re.sub(r'[.\s-]', '', value_str)
+                clean_value = value_str.translate(_RUT_STRIP_TABLE)
                 if 8 <= len(clean_value) <= 9:  # RUT chileno típico
                     rut_like_count += 1
 
@@ -389,9 +520,9 @@ class ContactsManager:
                 len(str_value) >= 5,  # Longitud mínima razonable
                 len(str_value) <= 100,  # Longitud máxima razonable
                 ' ' in str_value,  # Debe tener espacios (nombre y apellido)
-                re.search(r'[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ]', str_value),  # Debe tener letras
-                not re.search(r'^\d+$', str_value),  # No debe ser solo números
-                not re.search(r'^[0-9.-]+$', str_value),  # No debe ser solo números y símbolos
+                self._HAS_LETTER_RE.search(str_value),  # Debe tener letras
+                not self._ONLY_DIGITS_RE.search(str_value),  # No debe ser solo números
+                not self._ONLY_NUMERIC_SYMBOLS_RE.search(str_value),  # No debe ser solo números y símbolos
             ]
 
             # Si cumple la mayoría de condiciones, probablemente es un nombre
@@ -420,6 +551,19 @@ class ContactsManager:
             # Primer nombre + primer apellido
             return f"{palabras[0]} {palabras[1]}"[:20]
 
+    def _generate_alias_series(self, nombres: pd.Series) -> pd.Series:
+        """Versión vectorizada de _generate_alias para una columna de nombres"""
+        if nombres.empty:
+            return nombres.copy()
+
+        partes = nombres.str.split(n=2, expand=True)
+        primera = partes[0]
+        segunda = partes[1] if 1 in partes.columns else pd.Series(None, index=nombres.index, dtype=primera.dtype)
+        # Primer nombre + primer apellido; con una sola palabra, esa palabra
+        alias = (primera + ' ' + segunda).str.slice(0, 20)
+        alias = alias.where(segunda.notna(), primera.str.slice(0, 15))
+        return alias.fillna('')
+
     def save_contacts_to_database(self, df_contacts: pd.DataFrame, overwrite_existing: bool = False) -> Dict:
         """Guarda contactos en la base de datos"""
         if df_contacts.empty:
@@ -430,39 +574,31 @@ class ContactsManager:
         duplicate_count = 0
         errors = []
 
-        for _, row in df_contacts.iterrows():
-            try:
-                rut = row.get('rut', '')
-                nombre = row.get('nombre', '')
-                alias = row.get('alias', '')
-
-                if not rut or not nombre:
-                    error_count += 1
-                    continue
-
-                # Verificar si ya existe
-                existing_contact = self.datastore.find_contact_by_rut(rut)
+        # Columnas completas en vez de iterrows; las filas sin RUT o nombre son errores
+        def column(name: str) -> List:
+            if name not in df_contacts.columns:
+                return [''] * len(df_contacts)
+            return df_contacts[name].fillna('').tolist()
 
-                if existing_contact and not overwrite_existing:
-                    duplicate_count += 1
-                    continue
-                elif existing_contact and overwrite_existing:
-                    # Actualizar contacto existente
-                    if self.datastore.db.update_contact(rut, nombre, alias):
-                        saved_count += 1
-                    else:
-                        error_count += 1
-                else:
-                    # Crear nuevo contacto
-                    if self.datastore.add_contact(rut, nombre, alias, 'cliente'):
-                        saved_count += 1
-                    else:
-                        error_count += 1
-
-            except Exception as e:
+        batch = []
+        for rut, nombre, alias in zip(column('rut'), column('nombre'), column('alias')):
+            if not rut or not nombre:
                 error_count += 1
-                errors.append(f"Error con {row.get('rut', 'RUT desconocido')}: {str(e)}")
-                self.logger.error(f"Error guardando contacto: {e}")
+            else:
+                batch.append((rut, nombre, alias))
+
+        try:
+            # Una consulta para los existentes y dos executemany en una sola transacción
+            counts = self.datastore.db.bulk_upsert_contacts(
+                batch, contact_type='cliente', overwrite_existing=overwrite_existing
+            )
+            saved_count = counts['inserted'] + counts['updated']
+            duplicate_count = counts['duplicates']
+            error_count += counts['errors']
+        except Exception as e:
+            error_count += len(batch)
+            errors.append(f"Error guardando lote de {len(batch)} contactos: {str(e)}")
+            self.logger.error(f"Error guardando contactos: {e}")
 
         result = {
             'saved': saved_count,
@@ -479,86 +615,135 @@ class ContactsManager:
         if df.empty or 'Descripción' not in df.columns:
             return df
 
-        df_enhanced = df.copy()
-
-        # Cargar todos los contactos
+        # Cargar todos los contactos (índices cacheados mientras la base no cambie)
         try:
-            contacts = self.datastore.get_contacts()
-            if not contacts:
+            rut_to_contact, rut_codes, memo = self._get_rut_index()
+            if not rut_to_contact:
                 self.logger.info("No hay contactos en la base de datos para mejorar descripciones")
                 return df
 
-            # Crear diccionario de RUT -> contacto para búsqueda rápida
-            rut_to_contact = {}
-            for contact in contacts:
-                rut_clean = self.clean_rut(contact['rut'])
-                rut_to_contact[rut_clean] = contact
+            if len(memo) > _MAX_ENHANCED_MEMO:
+                memo.clear()
 
-            # Mejorar cada descripción
-            enhanced_descriptions = []
-            for desc in df_enhanced['Descripción']:
-                enhanced_desc = self._enhance_single_description(str(desc), rut_to_contact)
-                enhanced_descriptions.append(enhanced_desc)
+            # Mejorar cada descripción (las ya vistas con estos contactos salen del memo)
+            changed = False
 
-            df_enhanced['Descripción'] = enhanced_descriptions
+            def enhance(value) -> str:
+                nonlocal changed
+                desc = str(value)
+                enhanced_desc = memo.get(desc)
+                if enhanced_desc is None:
+                    enhanced_desc = self._enhance_single_description(desc, rut_to_contact, rut_codes)
+                    memo[desc] = enhanced_desc
+                if not changed and enhanced_desc != value:
+                    changed = True  # Se detecta en la misma pasada, sin comparar columnas después
+                return enhanced_desc
 
-            # Agregar columna con descripción original si hubo cambios
-            if any(orig != enh for orig, enh in zip(df['Descripción'], enhanced_descriptions)):
-                df_enhanced['Descripción_Original'] = df['Descripción']
+            enhanced_descriptions = df['Descripción'].map(enhance)
 
-            return df_enhanced
+            # Agregar columna con descripción original si hubo cambios (assign no copia el
+            # resto de las columnas con Copy-on-Write)
+            extra = {'Descripción_Original': df['Descripción']} if changed else {}
+            return df.assign(**{'Descripción': enhanced_descriptions}, **extra)
 
         except Exception as e:
             self.logger.error(f"Error mejorando descripciones: {e}")
             return df
 
-    def _enhance_single_description(self, description: str, rut_to_contact: Dict) -> str:
+    def _get_rut_index(self) -> Tuple[Dict[str, Dict], Tuple[np.ndarray, List[Dict]], Dict[str, str]]:
+        """RUT -> contacto, códigos de RUT y memo de descripciones, reconstruidos solo si la base cambió"""
+        db = getattr(self.datastore, 'db', None)
+        version = getattr(db, 'data_version', None)
+        cache_key = str(getattr(db, 'db_path', id(self.datastore)))
+
+        cached = _rut_index_cache.get(cache_key)
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1], cached[2], cached[3]
+
+        contacts = self.datastore.get_contacts()
+        if not contacts:
+            return {}, (np.empty(0, dtype=np.int64), []), {}
+
+        # Crear diccionario de RUT -> contacto para búsqueda rápida
+        ruts = self._clean_rut_series(pd.Series([contact['rut'] for contact in contacts], dtype=object))
+        rut_to_contact = dict(zip(ruts.tolist(), contacts))
+
+        # Tabla ordenada de códigos enteros (8 bytes por RUT) para buscar con searchsorted
+        rut_codes = self._build_rut_codes(rut_to_contact)
+
+        memo: Dict[str, str] = {}
+        if version is not None:
+            _rut_index_cache[cache_key] = (version, rut_to_contact, rut_codes, memo)
+        return rut_to_contact, rut_codes, memo
+
+    @staticmethod
+    def _rut_code(number: str, digit: str) -> int:
+        """Codifica un RUT como entero: número * 16 + dígito verificador (K = 10)"""
+        return int(number) * 16 + (10 if digit in 'kK' else int(digit))
+
+    def _build_rut_codes(self, rut_to_contact: Dict) -> Tuple[np.ndarray, List[Dict]]:
+        """Códigos int64 ordenados de los RUTs conocidos y sus contactos en el mismo orden"""
+        codes, contacts = [], []
+        for rut, contact in rut_to_contact.items():
+            number, _, digit = rut.replace('.', '').rpartition('-')
+            if not number.isdigit() or len(number) > 8 or digit not in _VALID_DVS:
+                continue  # El regex solo reconoce números de 7 u 8 dígitos
+            codes.append(self._rut_code(number, digit))
+            contacts.append(contact)
+
+        order = np.argsort(np.array(codes, dtype=np.int64), kind='stable')
+        return np.array(codes, dtype=np.int64)[order], [contacts[i] for i in order]
+
+    def _enhance_single_description(self, description: str, rut_to_contact: Dict,
+                                    rut_codes: Optional[Tuple[np.ndarray, List[Dict]]] = None) -> str:
         """Mejora una descripción individual"""
         if not description or pd.isna(description):
             return description
 
         enhanced = description
+        description_lower = description.lower()
+
+        # Una sola pasada con ambos formatos de RUT (completo o sin puntos)
+        for match in self._RUT_FIND_RE.finditer(description):
+            rut_found = match.group(1) or match.group(2)
+
+            # Buscar contacto (con la tabla de códigos no hace falta clean_rut)
+            if rut_codes is not None:
+                codes, code_contacts = rut_codes
+                # Lo capturado solo trae dígitos, '.' y '-' antes del DV
+                code = self._rut_code(rut_found[:-1].replace('.', '').replace('-', ''), rut_found[-1])
+                idx = codes.searchsorted(code)
+                contact = code_contacts[idx] if idx < len(codes) and codes[idx] == code else None
+            else:
+                contact = rut_to_contact.get(self.clean_rut(rut_found))
+            if contact:
+                alias = contact.get('alias', contact.get('name', ''))
+                if alias:
+                    # Reemplazar patrón completo manteniendo contexto
+                    if 'transf' in description_lower:
+                        replacement = f"Transferencia a {alias}"
+                    elif 'pago' in description_lower:
+                        replacement = f"Pago a {alias}"
+                    else:
+                        replacement = f"{alias} ({rut_found})"
 
-        # Patrones para encontrar RUTs en descripciones
-        rut_patterns = [
-            r'\b(\d{1,2}\.?\d{3}\.?\d{3}[-.]?[0-9kK])\b',  # Formato completo
-            r'\b(\d{7,8}[-.]?[0-9kK])\b',  # Formato sin puntos
-        ]
-
-        for pattern in rut_patterns:
-            matches = re.finditer(pattern, description, re.IGNORECASE)
-
-            for match in matches:
-                rut_found = match.group(1)
-                rut_clean = self.clean_rut(rut_found)
-
-                # Buscar contacto
-                contact = rut_to_contact.get(rut_clean)
-                if contact:
-                    alias = contact.get('alias', contact.get('name', ''))
-                    if alias:
-                        # Reemplazar patrón completo manteniendo contexto
-                        if 'transf' in description.lower():
-                            replacement = f"Transferencia a {alias}"
-                        elif 'pago' in description.lower():
-                            replacement = f"Pago a {alias}"
-                        else:
-                            replacement = f"{alias} ({rut_found})"
-
-                        # Reemplazar toda la parte de la transferencia
-                        enhanced = re.sub(
-                            rf'.*{re.escape(rut_found)}.*',
-                            replacement,
-                            enhanced,
-                            flags=re.IGNORECASE
-                        )
+                    # Reemplazar toda la parte de la transferencia (la descripción
+                    # completa si contiene el RUT; sin armar un regex por coincidencia)
+                    if rut_found.lower() in enhanced.lower():
+                        enhanced = replacement
 
         return enhanced
 
+    def get_contacts(self) -> Sequence[Mapping]:
+        """Contactos activos (solo lectura), cacheados en el datastore hasta que la base cambie"""
+        if hasattr(self.datastore, 'get_contacts_cached'):
+            return self.datastore.get_contacts_cached()
+        return self.datastore.get_contacts()
+
     def get_contacts_summary(self) -> Dict:
         """Obtiene resumen de contactos en la base de datos"""
         try:
-            contacts = self.datastore.get_contacts()
+            contacts = self.get_contacts()
 
             if not contacts:
                 return {
@@ -599,23 +784,8 @@ class ContactsManager:
             return []
 
         try:
-            contacts = self.datastore.get_contacts()
-            query_lower = query.lower().strip()
-
-            matching_contacts = []
-            for contact in contacts:
-                # Buscar en RUT, nombre y alias
-                rut = str(contact.get('rut', '')).lower()
-                name = str(contact.get('name', '')).lower()
-                alias = str(contact.get('alias', '')).lower()
-
-                if (query_lower in rut or
-                        query_lower in name or
-                        query_lower in alias):
-                    matching_contacts.append(contact)
-
-            return matching_contacts
-
+            # Filtrado en SQLite (LIKE sobre casefold, también para tildes y Ñ) en vez de recorrer la tabla
+            return self.datastore.search_contacts_sql(query.strip())
         except Exception as e:
             self.logger.error(f"Error buscando contactos: {e}")
             return []
@@ -649,6 +819,28 @@ def show_contacts_management_page(datastore):
         show_contact_search(contacts_manager)
 
 
+def _contacts_display_frame(contacts: Sequence[Mapping]) -> pd.DataFrame:
+    """DataFrame de contactos con las columnas y nombres de la lista"""
+    # Construir el DataFrame por columnas
+    display_columns = ['rut', 'name', 'alias', 'contact_type']
+    available_columns = [col for col in display_columns if contacts and col in contacts[0]]
+
+    df_display = pd.DataFrame({
+        col: [contact.get(col) for contact in contacts]
+        for col in available_columns
+    })
+    df_display = df_display.rename(columns={
+        'rut': 'RUT',
+        'name': 'Nombre Completo',
+        'alias': 'Alias',
+        'contact_type': 'Tipo'
+    })
+    if 'Tipo' in df_display.columns:
+        # Pocos valores distintos: categórico en lugar de un string por fila
+        df_display['Tipo'] = df_display['Tipo'].astype('category')
+    return df_display
+
+
 def show_contacts_list(contacts_manager):
     """Muestra lista completa de contactos"""
     st.markdown("### 📋 Lista de Contactos")
@@ -678,76 +870,66 @@ def show_contacts_list(contacts_manager):
         proveedores = summary['by_type'].get('proveedor', 0)
         st.metric("📦 Proveedores", proveedores)
 
-    # Lista completa de contactos
+    # Filtros
+    st.markdown("#### 🔍 Filtros")
+    col_filter1, col_filter2 = st.columns(2)
+
+    with col_filter1:
+        type_filter = st.selectbox(
+            "Filtrar por tipo:",
+            options=['Todos'] + list(summary['by_type'].keys()),
+            key="contact_type_filter"
+        )
+
+    with col_filter2:
+        search_text = st.text_input(
+            "Buscar por nombre/RUT:",
+            placeholder="Escribe para filtrar...",
+            key="contact_search_filter"
+        )
+
+    # Lista de contactos
     try:
-        contacts = contacts_manager.datastore.get_contacts()
-
-        if contacts:
-            # Convertir a DataFrame para mostrar mejor
-            df_contacts = pd.DataFrame(contacts)
-
-            # Seleccionar y renombrar columnas para display
-            display_columns = ['rut', 'name', 'alias', 'contact_type']
-            available_columns = [col for col in display_columns if col in df_contacts.columns]
-
-            if available_columns:
-                df_display = df_contacts[available_columns].copy()
-                df_display = df_display.rename(columns={
-                    'rut': 'RUT',
-                    'name': 'Nombre Completo',
-                    'alias': 'Alias',
-                    'contact_type': 'Tipo'
-                })
-
-                # Filtros
-                st.markdown("#### 🔍 Filtros")
-                col_filter1, col_filter2 = st.columns(2)
-
-                with col_filter1:
-                    type_filter = st.selectbox(
-                        "Filtrar por tipo:",
-                        options=['Todos'] + list(summary['by_type'].keys()),
-                        key="contact_type_filter"
-                    )
-
-                with col_filter2:
-                    search_text = st.text_input(
-                        "Buscar por nombre/RUT:",
-                        placeholder="Escribe para filtrar...",
-                        key="contact_search_filter"
-                    )
-
-                # Aplicar filtros
-                df_filtered = df_display.copy()
-
-                if type_filter != 'Todos':
-                    df_filtered = df_filtered[df_filtered['Tipo'] == type_filter]
-
-                if search_text:
-                    mask = (
-                            df_filtered['RUT'].str.contains(search_text, case=False, na=False) |
-                            df_filtered['Nombre Completo'].str.contains(search_text, case=False, na=False) |
-                            df_filtered['Alias'].str.contains(search_text, case=False, na=False)
-                    )
-                    df_filtered = df_filtered[mask]
-
-                # Mostrar tabla
-                st.markdown(f"#### 📊 Contactos ({len(df_filtered)} de {len(df_display)})")
-                st.dataframe(
-                    df_filtered,
-                    use_container_width=True,
-                    hide_index=True
-                )
+        truncated = False
+        if type_filter != 'Todos' or search_text.strip():
+            # Filtros en SQL (WHERE + LIMIT): solo viajan las filas que se muestran;
+            # una fila extra indica que hay más resultados que el límite
+            contacts = contacts_manager.datastore.search_contacts_sql(
+                search_text.strip(),
+                limit=_CONTACTS_LIST_LIMIT + 1,
+                contact_type=None if type_filter == 'Todos' else type_filter
+            )
+            truncated = len(contacts) > _CONTACTS_LIST_LIMIT
+            contacts = contacts[:_CONTACTS_LIST_LIMIT]
+        else:
+            contacts = contacts_manager.get_contacts()
 
-                # Botón de exportación
-                if st.button("📥 Exportar contactos a CSV"):
-                    csv = df_filtered.to_csv(index=False)
-                    st.download_button(
-                        label="⬇️ Descargar CSV",
-                        data=csv,
-                        file_name=f"contactos_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv"
-                    )
+        df_filtered = _contacts_display_frame(contacts)
+
+        # Mostrar tabla
+        st.markdown(f"#### 📊 Contactos ({len(df_filtered)} de {summary['total_contacts']})")
+        if truncated:
+            st.warning(f"⚠️ Hay más de {_CONTACTS_LIST_LIMIT} coincidencias; se muestran solo las primeras "
+                       f"{_CONTACTS_LIST_LIMIT}. Refina la búsqueda para ver las demás.")
+
+        if not df_filtered.empty:
+            st.dataframe(
+                df_filtered,
+                use_container_width=True,
+                hide_index=True
+            )
+
+            # Botón de exportación
+            if st.button("📥 Exportar contactos a CSV"):
+                csv = df_filtered.to_csv(index=False)
+                st.download_button(
+                    label="⬇️ Descargar CSV",
+                    data=csv,
+                    file_name=f"contactos_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                    mime="text/csv"
+                )
+        else:
+            st.info("🔍 No hay contactos que coincidan con los filtros.")
 
     except Exception as e:
         st.error(f"❌ Error mostrando contactos: {e}")
@@ -778,15 +960,31 @@ def show_excel_upload(contacts_manager):
     if uploaded_file is not None:
         try:
             with st.spinner("Procesando archivo Excel..."):
-                # Guardar archivo temporalmente
-                temp_path = Path(f"uploads/{uploaded_file.name}")
-                temp_path.parent.mkdir(exist_ok=True)
+                # El archivo se parsea una sola vez; los reruns (checkbox, guardar) reutilizan el resultado
+                file_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+                cached = st.session_state.get('contacts_excel_upload')
+
+                if cached is not None and cached[0] == file_key:
+                    df_contacts, stats = cached[1], cached[2]
+                else:
+                    # Guardar archivo temporalmente
+                    temp_path = Path(f"uploads/{uploaded_file.name}")
+                    temp_path.parent.mkdir(exist_ok=True)
 
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                    with open(temp_path, "wb") as f:
+                        f.write(uploaded_file.getbuffer())
 
-                # Procesar contactos
-                df_contacts, stats = contacts_manager.load_contacts_from_excel(temp_path)
+                    # Procesar contactos en un hilo aparte mostrando la etapa en curso
+                    progress_bar = st.progress(0.0, text="Leyendo archivo...")
+                    try:
+                        df_contacts, stats = _load_contacts_excel_in_background(
+                            contacts_manager, temp_path, progress_bar)
+                    finally:
+                        # Limpiar archivo temporal
+                        progress_bar.empty()
+                        temp_path.unlink(missing_ok=True)
+
+                    st.session_state['contacts_excel_upload'] = (file_key, df_contacts, stats)
 
                 # Mostrar estadísticas de procesamiento
                 st.success(f"✅ Archivo procesado exitosamente")
@@ -863,9 +1061,6 @@ def show_excel_upload(contacts_manager):
                 else:
                     st.warning("⚠️ No se encontraron contactos válidos en el archivo")
 
-                # Limpiar archivo temporal
-                temp_path.unlink(missing_ok=True)
-
         except Exception as e:
             st.error(f"❌ Error procesando archivo: {e}")
 
@@ -933,7 +1128,7 @@ def show_manual_contact_form(contacts_manager):
                         nombre_clean)
 
                     # Verificar si ya existe
-                    existing = contacts_manager.datastore.find_contact_by_rut(rut_clean)
+                    existing = contacts_manager.datastore.find_contacts_by_ruts([rut_clean]).get(rut_clean)
 
                     if existing:
                         st.warning(f"⚠️ Ya existe un contacto con RUT {rut_clean}: {existing.get('name', '')}")
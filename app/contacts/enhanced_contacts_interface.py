@@ -4,8 +4,12 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import logging
+import re
 from typing import Dict, List
 
+# Razones sociales típicas de empresas (compilado una sola vez; sin grupos de captura)
+_EMPRESA_RE = re.compile(r'\b(?:SPA|LTDA|LIMITADA|SOCIEDAD|CIA|EMPRESA|COMERCIAL)\b', re.IGNORECASE)
+
 
 def show_enhanced_transfer_upload(datastore):
     """Interfaz mejorada para cargar resúmenes de transferencia"""
@@ -209,18 +213,16 @@ def show_contact_analysis(df_contacts: pd.DataFrame, stats: Dict):
 
         # Análisis de longitud de nombres
         if not df_contacts.empty and 'nombre' in df_contacts.columns:
-            avg_name_length = df_contacts['nombre'].str.len().mean()
+            nombres = df_contacts['nombre']
+            avg_name_length = nombres.str.len().mean()
             st.write(f"• Longitud promedio de nombres: {avg_name_length:.0f} caracteres")
 
-            # Tipos de contactos (personas vs empresas)
-            empresas = df_contacts[df_contacts['nombre'].str.contains(
-                r'\b(SPA|LTDA|LIMITADA|SOCIEDAD|CIA|EMPRESA|COMERCIAL)\b',
-                case=False, na=False
-            )]
-            personas = len(df_contacts) - len(empresas)
+            # Tipos de contactos (personas vs empresas): contar la máscara sin filtrar el DataFrame
+            n_empresas = int(nombres.str.contains(_EMPRESA_RE, na=False).sum())
+            personas = len(df_contacts) - n_empresas
 
             st.write(f"• Personas naturales: {personas:,}")
-            st.write(f"• Empresas/Sociedades: {len(empresas):,}")
+            st.write(f"• Empresas/Sociedades: {n_empresas:,}")
 
     # Mostrar muestra de datos originales si hay info de columnas
     if stats.get('rut_column_detected') and stats.get('name_column_detected'):
@@ -271,14 +273,15 @@ def show_contacts_statistics(datastore):
     st.markdown("### 📊 Estadísticas de Contactos")
 
     try:
-        # Obtener estadísticas desde el datastore
-        contacts = datastore.get_contacts()
+        # Obtener contactos desde el datastore (DataFrame directo desde el cursor)
+        df_contacts = datastore.get_contacts_df()
 
-        if not contacts:
+        if df_contacts.empty:
             st.info("📝 No hay contactos registrados aún")
             return
 
-        df_contacts = pd.DataFrame(contacts)
+        # Solo los campos usados en las estadísticas
+        df_contacts = df_contacts.reindex(columns=['rut', 'name', 'alias', 'contact_type'])
 
         # Métricas principales
         col1, col2, col3, col4 = st.columns(4)
@@ -287,11 +290,11 @@ def show_contacts_statistics(datastore):
             st.metric("👥 Total Contactos", len(df_contacts))
 
         with col2:
-            clientes = len(df_contacts[df_contacts['contact_type'] == 'cliente'])
+            clientes = int((df_contacts['contact_type'] == 'cliente').sum())
             st.metric("🏢 Clientes", clientes)
 
         with col3:
-            proveedores = len(df_contacts[df_contacts['contact_type'] == 'proveedor'])
+            proveedores = int((df_contacts['contact_type'] == 'proveedor').sum())
             st.metric("📦 Proveedores", proveedores)
 
         with col4:
@@ -319,21 +322,18 @@ def show_contacts_statistics(datastore):
         with st.expander("🔍 Análisis de Calidad de Datos"):
 
             # Contactos sin alias
-            sin_alias = len(df_contacts[df_contacts['alias'].isna() | (df_contacts['alias'] == '')])
+            sin_alias = int((df_contacts['alias'].isna() | (df_contacts['alias'] == '')).sum())
             st.write(f"• Contactos sin alias: {sin_alias}")
 
             # Longitud promedio de nombres
             avg_name_length = df_contacts['name'].str.len().mean()
             st.write(f"• Longitud promedio de nombres: {avg_name_length:.1f} caracteres")
 
-            # Empresas vs personas (estimado)
-            empresas = df_contacts[df_contacts['name'].str.contains(
-                r'\b(SPA|LTDA|LIMITADA|SOCIEDAD|CIA|EMPRESA|COMERCIAL)\b',
-                case=False, na=False
-            )]
-            st.write(f"• Empresas detectadas: {len(empresas)} ({len(empresas) / len(df_contacts) * 100:.1f}%)")
-            st.write(
-                f"• Personas naturales: {len(df_contacts) - len(empresas)} ({(len(df_contacts) - len(empresas)) / len(df_contacts) * 100:.1f}%)")
+            # Empresas vs personas (estimado): contar la máscara sin filtrar el DataFrame
+            n_empresas = int(df_contacts['name'].str.contains(_EMPRESA_RE, na=False).sum())
+            n_personas = len(df_contacts) - n_empresas
+            st.write(f"• Empresas detectadas: {n_empresas} ({n_empresas / len(df_contacts) * 100:.1f}%)")
+            st.write(f"• Personas naturales: {n_personas} ({n_personas / len(df_contacts) * 100:.1f}%)")
 
     except Exception as e:
         st.error(f"❌ Error obteniendo estadísticas: {e}")
@@ -561,15 +561,15 @@ def show_contacts_list(contacts_manager):
         contacts = contacts_manager.datastore.get_contacts()
 
         if contacts:
-            # Convertir a DataFrame para mostrar mejor
-            df_contacts = pd.DataFrame(contacts)
-
-            # Seleccionar y renombrar columnas para display
+            # Seleccionar columnas para display y construir el DataFrame por columnas
             display_columns = ['rut', 'name', 'alias', 'contact_type']
-            available_columns = [col for col in display_columns if col in df_contacts.columns]
+            available_columns = [col for col in display_columns if col in contacts[0]]
 
             if available_columns:
-                df_display = df_contacts[available_columns].copy()
+                df_display = pd.DataFrame({
+                    col: [contact.get(col) for contact in contacts]
+                    for col in available_columns
+                })
                 df_display = df_display.rename(columns={
                     'rut': 'RUT',
                     'name': 'Nombre Completo',
@@ -1,7 +1,7 @@
 # app/database/connection_pool.py
 import sqlite3
 import threading
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
 from queue import Queue, Empty
 
 
@@ -12,9 +12,19 @@ class ConnectionPool:
         self.pool = Queue(maxsize=max_connections)
         self.lock = threading.Lock()
 
-        # Pre-crear conexiones
+        # journal_mode=WAL es persistente y de toda la base: se fija una sola vez
+        bootstrap = sqlite3.connect(self.database_path, timeout=30)
+        try:
+            bootstrap.execute("PRAGMA journal_mode=WAL;")
+        finally:
+            bootstrap.close()
+
+        # Pre-crear conexiones (las del pool vuelven a él; las temporales se cierran)
+        self._owned = set()
+        self._missing = 0  # Conexiones propias descartadas aún sin reponer
         for _ in range(max_connections):
             conn = self._create_connection()
+            self._owned.add(conn)
             self.pool.put(conn)
 
     def _create_connection(self):
@@ -23,25 +33,79 @@ class ConnectionPool:
             check_same_thread=False,
             timeout=30
         )
-        # Configuraciones de performance
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA synchronous=NORMAL;")
-        conn.execute("PRAGMA cache_size=10000;")
+        # Configuraciones de performance (solo las que son por conexión)
+        conn.executescript(
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA cache_size=-20000;"  # en KiB (~20 MB)
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA mmap_size=268435456;"  # lecturas vía page cache del SO (256 MB)
+        )
         return conn
 
     @contextmanager
     def get_connection(self):
-        conn = None
+        if self._missing:
+            # Reponer antes de esperar: con el pool incompleto, get() podría bloquear sin motivo
+            self._restore_missing()
+
         try:
             # Obtener conexión del pool
             conn = self.pool.get(timeout=10)
-            yield conn
         except Empty:
-            # Si no hay conexiones disponibles, crear una temporal
+            # Si no hay conexiones disponibles, crear una; si falta alguna propia, ocupa su lugar
             conn = self._create_connection()
+            with self.lock:
+                if self._missing:
+                    self._missing -= 1
+                    self._owned.add(conn)
+
+        broken = False
+        try:
             yield conn
+        except Exception:
+            # Error de sentencia (IntegrityError, tabla inexistente...): se deshace la transacción
+            # y la conexión se reutiliza; solo se descarta si ya no responde
+            broken = conn in self._owned and not self._recover(conn)
+            raise
         finally:
-            if conn and self.pool.qsize() < self.max_connections:
-                self.pool.put(conn)
-            elif conn:
-                conn.close()
\ No newline at end of file
+            if conn not in self._owned:
+                conn.close()
+            elif broken:
+                self._discard(conn)
+            else:
+                # Nunca está lleno: el pool solo contiene conexiones propias
+                self.pool.put_nowait(conn)
+
+    def _recover(self, conn) -> bool:
+        """Deshace la transacción abierta; False si la conexión quedó inutilizable"""
+        try:
+            conn.rollback()
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:  # p. ej. ProgrammingError: conexión cerrada
+            return False
+
+    def _discard(self, conn):
+        """Saca una conexión propia inutilizable; su lugar se repone en el próximo get_connection"""
+        with self.lock:
+            self._owned.discard(conn)
+            self._missing += 1
+        with suppress(sqlite3.Error):
+            conn.close()
+
+    def _restore_missing(self):
+        """Crea las conexiones propias que faltan; si falla, se reintenta más adelante"""
+        while True:
+            with self.lock:
+                if not self._missing:
+                    return
+                self._missing -= 1
+            try:
+                conn = self._create_connection()
+            except sqlite3.Error:
+                with self.lock:
+                    self._missing += 1
+                return
+            with self.lock:
+                self._owned.add(conn)
+            self.pool.put_nowait(conn)
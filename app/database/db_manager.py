@@ -2,10 +2,22 @@
 import sqlite3
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
 import re
+import threading
 from contextlib import contextmanager
 
+# Patrones compilados una sola vez
+_RUT_CLEAN_RE = re.compile(r'[.\s-]')
+# RUT dentro de una descripción (7-8 dígitos, separador opcional y DV)
+_RUT_RE = re.compile(r'\b(\d{7,8}[-.]?\w)\b')
+
+
+def _casefold(value):
+    """casefold() para SQLite: LIKE solo ignora mayúsculas en ASCII (Á, Ñ, ...)"""
+    return value.casefold() if isinstance(value, str) else value
+
 
 class DatabaseManager:
     """Gestor de base de datos SQLite para la aplicación"""
@@ -13,8 +25,26 @@ class DatabaseManager:
     def __init__(self, db_path: str = "data/finance_app.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_version = 0
+        self._contact_index: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
+        # RUT -> contacto activo (solo lectura) y la misma lista ordenada por nombre,
+        # válidos mientras data_version no cambie
+        self._contacts_cache: Optional[Tuple[Tuple[int, int], Dict[str, Mapping], Tuple[Mapping, ...]]] = None
+        self._contacts_cache_lock = threading.Lock()
         self.init_database()
 
+    @property
+    def data_version(self) -> Tuple[int, int]:
+        """Token que cambia con cada escritura; sirve para invalidar cachés derivados"""
+        try:
+            mtime = self.db_path.stat().st_mtime_ns  # escrituras desde otras instancias
+        except OSError:
+            mtime = 0
+        return self._write_version, mtime
+
+    def _bump_version(self):
+        self._write_version += 1
+
     def init_database(self):
         """Inicializa las tablas de la base de datos"""
         with self.get_connection() as conn:
@@ -138,7 +168,7 @@ class DatabaseManager:
             query += " ORDER BY name"
 
             rows = conn.execute(query).fetchall()
-            return [dict(row) for row in rows]
+            return list(map(dict, rows))
 
     def add_category(self, name: str, description: str = None) -> bool:
         """Agrega una nueva categoría"""
@@ -149,6 +179,7 @@ class DatabaseManager:
                     VALUES (?, ?)
                 """, (name.lower().strip(), description))
                 conn.commit()
+                self._bump_version()
                 return True
         except sqlite3.IntegrityError:
             return False  # Categoría ya existe
@@ -161,6 +192,7 @@ class DatabaseManager:
                 WHERE name = ?
             """, (name,))
             conn.commit()
+            self._bump_version()
             return cursor.rowcount > 0
 
     # === GESTIÓN DE CONTACTOS ===
@@ -174,7 +206,19 @@ class DatabaseManager:
             query += " ORDER BY name"
 
             rows = conn.execute(query).fetchall()
-            return [dict(row) for row in rows]
+            return list(map(dict, rows))
+
+    def get_contacts_df(self, active_only: bool = True) -> pd.DataFrame:
+        """Obtiene todos los contactos como DataFrame, sin pasar por un dict por fila"""
+        with self.get_connection() as conn:
+            query = "SELECT * FROM contacts"
+            if active_only:
+                query += " WHERE is_active = 1"
+            query += " ORDER BY name"
+
+            cursor = conn.execute(query)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
 
     def add_contact(self, rut: str, name: str, alias: str = None, contact_type: str = 'proveedor') -> bool:
         """Agrega un nuevo contacto"""
@@ -185,39 +229,159 @@ class DatabaseManager:
                     VALUES (?, ?, ?, ?)
                 """, (self._clean_rut(rut), name.strip(), alias, contact_type))
                 conn.commit()
+                self._bump_version()
                 return True
         except sqlite3.IntegrityError:
             return False  # RUT ya existe
 
-    def find_contact_by_rut(self, rut: str) -> Optional[Dict]:
-        """Busca un contacto por RUT"""
+    def search_contacts(self, pattern: str, limit: int = 50, contact_type: str = None) -> List[Dict]:
+        """Busca contactos activos cuyo RUT, nombre o alias contenga el texto (opcionalmente de un tipo)"""
+        escaped = pattern.casefold().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        like = f"%{escaped}%"
+        type_clause = "AND contact_type = ?" if contact_type else ""
+        params = (like, like, like) + ((contact_type,) if contact_type else ()) + (limit,)
         with self.get_connection() as conn:
-            row = conn.execute("""
+            conn.create_function('casefold', 1, _casefold, deterministic=True)
+            rows = conn.execute(f"""
                 SELECT * FROM contacts 
-                WHERE rut = ? AND is_active = 1
-            """, (self._clean_rut(rut),)).fetchone()
+                WHERE is_active = 1 
+                  AND (rut LIKE ? ESCAPE '\\' OR casefold(name) LIKE ? ESCAPE '\\'
+                       OR casefold(alias) LIKE ? ESCAPE '\\')
+                  {type_clause}
+                ORDER BY name
+                LIMIT ?
+            """, params).fetchall()
+            return [dict(row) for row in rows]
+
+    def _load_contacts_cache(self) -> Tuple[Tuple[int, int], Dict[str, Mapping], Tuple[Mapping, ...]]:
+        """Contactos activos en memoria; se recargan cuando cambia data_version"""
+        version = self.data_version
+        cached = self._contacts_cache
+        if cached is not None and cached[0] == version:
+            return cached
+
+        with self._contacts_cache_lock:
+            cached = self._contacts_cache
+            if cached is None or cached[0] != version:
+                contacts = tuple(map(MappingProxyType, self.get_contacts()))
+                cached = (version, {contact['rut']: contact for contact in contacts}, contacts)
+                self._contacts_cache = cached
+        return cached
+
+    def _get_contacts_cache(self) -> Dict[str, Mapping]:
+        """Contactos activos por RUT (solo lectura)"""
+        return self._load_contacts_cache()[1]
+
+    def get_contacts_cached(self) -> Tuple[Mapping, ...]:
+        """Contactos activos ordenados por nombre, compartidos y de solo lectura (sin consulta si la base no cambió)"""
+        return self._load_contacts_cache()[2]
 
-            return dict(row) if row else None
+    def find_contact_by_rut(self, rut: str) -> Optional[Dict]:
+        """Busca un contacto por RUT"""
+        contact = self._get_contacts_cache().get(self._clean_rut(rut))
+        return dict(contact) if contact else None
+
+    def find_contacts_by_ruts(self, ruts: List[str]) -> Dict[str, Dict]:
+        """Busca varios contactos por RUT con consultas IN; devuelve RUT (como se pidió) -> contacto"""
+        by_clean: Dict[str, List[str]] = {}
+        for rut in ruts:
+            if rut:
+                by_clean.setdefault(self._clean_rut(rut), []).append(rut)
+
+        found = {}
+        clean_ruts = list(by_clean)
+        with self.get_connection() as conn:
+            for start in range(0, len(clean_ruts), 500):
+                chunk = clean_ruts[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT * FROM contacts WHERE rut IN ({placeholders}) AND is_active = 1", chunk
+                ).fetchall()
+                for row in rows:
+                    contact = dict(row)
+                    for rut in by_clean[contact['rut']]:
+                        found[rut] = contact
+        return found
 
     def update_contact(self, rut: str, name: str = None, alias: str = None) -> bool:
         """Actualiza información de contacto"""
+        # Un solo UPDATE con los campos informados
+        sets, params = [], []
+        if name:
+            sets.append("name = ?")
+            params.append(name)
+        if alias:
+            sets.append("alias = ?")
+            params.append(alias)
+        if not sets:
+            return False
+        params.append(self._clean_rut(rut))
+
         with self.get_connection() as conn:
-            if name:
-                conn.execute("""
-                    UPDATE contacts 
-                    SET name = ?, updated_at = CURRENT_TIMESTAMP 
-                    WHERE rut = ?
-                """, (name, self._clean_rut(rut)))
+            cursor = conn.execute(f"""
+                UPDATE contacts 
+                SET {', '.join(sets)}, updated_at = CURRENT_TIMESTAMP 
+                WHERE rut = ?
+            """, params)
+            conn.commit()
+            if cursor.rowcount > 0:
+                self._bump_version()
+            return cursor.rowcount > 0
 
-            if alias:
-                conn.execute("""
+    def bulk_upsert_contacts(self, contacts: List[Tuple[str, str, Optional[str]]],
+                             contact_type: str = 'cliente',
+                             overwrite_existing: bool = False) -> Dict[str, int]:
+        """Inserta/actualiza contactos (rut, name, alias) en una sola transacción"""
+        counts = {'inserted': 0, 'updated': 0, 'duplicates': 0, 'errors': 0}
+        if not contacts:
+            return counts
+
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Estado actual de todos los RUTs del lote en pocas consultas
+                ruts = list({self._clean_rut(rut) for rut, _, _ in contacts})
+                status = {}
+                for start in range(0, len(ruts), 500):
+                    chunk = ruts[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT rut, is_active FROM contacts WHERE rut IN ({placeholders})", chunk
+                    ).fetchall()
+                    status.update((row['rut'], bool(row['is_active'])) for row in rows)
+
+                to_insert, to_update = [], []
+                for rut, name, alias in contacts:
+                    rut = self._clean_rut(rut)
+                    if rut not in status:
+                        to_insert.append((rut, name.strip(), alias, contact_type))
+                        status[rut] = True  # Repetidos en el mismo lote cuentan como existentes
+                    elif not status[rut]:
+                        counts['errors'] += 1  # Inactivo: el INSERT violaría UNIQUE
+                    elif overwrite_existing:
+                        to_update.append((name or None, alias or None, rut))
+                    else:
+                        counts['duplicates'] += 1
+
+                conn.executemany("""
+                    INSERT INTO contacts (rut, name, alias, contact_type) 
+                    VALUES (?, ?, ?, ?)
+                """, to_insert)
+                conn.executemany("""
                     UPDATE contacts 
-                    SET alias = ?, updated_at = CURRENT_TIMESTAMP 
+                    SET name = COALESCE(?, name), alias = COALESCE(?, alias),
+                        updated_at = CURRENT_TIMESTAMP 
                     WHERE rut = ?
-                """, (alias, self._clean_rut(rut)))
+                """, to_update)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
-            conn.commit()
-            return True
+        counts['inserted'] = len(to_insert)
+        counts['updated'] = len(to_update)
+        self._bump_version()
+        return counts
 
     # === GESTIÓN DE TRANSACCIONES ETIQUETADAS ===
 
@@ -226,21 +390,27 @@ class DatabaseManager:
         if df.empty:
             return
 
+        def column(name, default):
+            return df[name].tolist() if name in df.columns else [default] * len(df)
+
+        # Columnas como listas de escalares Python; sin descripción original se usa la descripción
+        description = column('description', '')
+        if 'original_description' in df.columns:
+            original = df['original_description'].fillna(pd.Series(description, index=df.index)).tolist()
+        else:
+            original = description
+        rows = zip(column('date', ''), description, original, column('amount', 0),
+                   column('category', ''), column('debit_credit', ''))
+
         with self.get_connection() as conn:
-            for _, row in df.iterrows():
-                conn.execute("""
-                    INSERT OR REPLACE INTO labeled_transactions 
-                    (date, description, original_description, amount, category, debit_credit)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    row.get('date', ''),
-                    row.get('description', ''),
-                    row.get('original_description', row.get('description', '')),
-                    row.get('amount', 0),
-                    row.get('category', ''),
-                    row.get('debit_credit', '')
-                ))
+            # Una sola sentencia preparada para todas las filas, en una transacción
+            conn.executemany("""
+                INSERT OR REPLACE INTO labeled_transactions 
+                (date, description, original_description, amount, category, debit_credit)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
             conn.commit()
+            self._bump_version()
 
     def get_labeled_transactions(self) -> pd.DataFrame:
         """Obtiene todas las transacciones etiquetadas"""
@@ -250,7 +420,10 @@ class DatabaseManager:
                 FROM labeled_transactions 
                 ORDER BY date DESC
             """
-            return pd.read_sql_query(query, conn)
+            # Filas directo del cursor a DataFrame (sin la capa genérica de read_sql_query)
+            cursor = conn.execute(query)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
 
     # === UTILIDADES ===
 
@@ -260,7 +433,7 @@ class DatabaseManager:
             return ""
 
         # Remover puntos y guiones
-        clean = re.sub(r'[.\s-]', '', str(rut))
+        clean = _RUT_CLEAN_RE.sub('', str(rut))
 
         # Formato estándar: XXXXXXXX-X
         if len(clean) >= 8:
@@ -268,30 +441,32 @@ class DatabaseManager:
 
         return clean
 
-    def enhance_description_with_contacts(self, description: str) -> str:
+    def build_contact_index(self) -> Dict[str, str]:
+        """RUT -> alias (o nombre) de los contactos activos, reconstruido solo si la base cambió"""
+        version = self.data_version
+        if self._contact_index is not None and self._contact_index[0] == version:
+            return self._contact_index[1]
+
+        index = {rut: contact['alias'] or contact['name'] for rut, contact in self._get_contacts_cache().items()}
+        self._contact_index = (version, index)
+        return index
+
+    def enhance_description_with_contacts(self, description: str, index: Optional[Dict[str, str]] = None) -> str:
         """Mejora descripción reemplazando RUTs por nombres"""
         if not description:
             return description
 
-        # Buscar patrones de RUT en la descripción
-        rut_pattern = r'\b(\d{7,8}[-.]?\w)\b'
-        ruts_found = re.findall(rut_pattern, description)
-
-        enhanced_description = description
+        if index is None:
+            index = self.build_contact_index()
 
-        for rut in ruts_found:
-            contact = self.find_contact_by_rut(rut)
-            if contact:
-                # Usar alias si existe, sino el nombre completo
-                display_name = contact['alias'] if contact['alias'] else contact['name']
-
-                # Reemplazar RUT por nombre en la descripción
-                enhanced_description = enhanced_description.replace(
-                    rut,
-                    f"{display_name} ({rut})"
-                )
+        def replace(match):
+            rut = match.group(1)
+            display_name = index.get(self._clean_rut(rut))
+            # Usar alias si existe, sino el nombre completo
+            return f"{display_name} ({rut})" if display_name else match.group(0)
 
-        return enhanced_description
+        # Buscar patrones de RUT y reemplazarlos en una sola pasada
+        return _RUT_RE.sub(replace, description)
 
     def get_statistics(self) -> Dict:
         """Obtiene estadísticas generales"""
@@ -6,6 +6,8 @@ from pathlib import Path
 import traceback
 from datetime import datetime
 
+from utils.io import read_excel_fast
+
 # Import del sistema de componentes robusto
 from components.component_manager import (
     get_component,
@@ -15,6 +17,10 @@ from components.component_manager import (
     handle_component_error
 )
 
+# Copy-on-Write: las copias de DataFrames se materializan solo al escribir (por defecto desde pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 # Configuración de la página
 st.set_page_config(
     page_title="Santander Finance App",
@@ -152,22 +158,16 @@ def page_upload(parser):
     if uploaded_file is not None:
         try:
             with st.spinner("Procesando cartola..."):
-                # Save uploaded file temporarily
-                temp_path = Path(f"uploads/{uploaded_file.name}")
-                temp_path.parent.mkdir(exist_ok=True)
-
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-                # Validate file básico
-                size_mb = temp_path.stat().st_size / (1024 * 1024)
+                # Validate file básico (se lee directo desde memoria, sin archivo temporal)
+                size_mb = uploaded_file.size / (1024 * 1024)
+                suffix = Path(uploaded_file.name).suffix
 
                 col1, col2 = st.columns([2, 1])
 
                 with col2:
                     st.markdown("### 📊 Info del archivo")
                     st.info(f"**Tamaño:** {size_mb:.1f} MB")
-                    st.info(f"**Formato:** {temp_path.suffix}")
+                    st.info(f"**Formato:** {suffix}")
 
                 with col1:
                     if size_mb > 50:
@@ -176,7 +176,9 @@ def page_upload(parser):
 
                     # Read and parse file con manejo de errores
                     try:
-                        df_raw = pd.read_excel(temp_path)
+                        # dtype=str: el parser normaliza montos y fechas por su cuenta
+                        uploaded_file.seek(0)
+                        df_raw = read_excel_fast(uploaded_file, dtype=str)
                         st.success(f"✅ Archivo leído: {len(df_raw)} filas, {len(df_raw.columns)} columnas")
                     except Exception as e:
                         st.error(f"❌ Error leyendo archivo: {str(e)}")
@@ -198,9 +200,6 @@ def page_upload(parser):
                 st.markdown("### 👀 Vista previa de datos procesados")
                 show_transaction_preview(df_parsed)
 
-                # Clean up temp file
-                temp_path.unlink(missing_ok=True)
-
         except Exception as e:
             st.error(f"❌ Error general procesando archivo: {str(e)}")
             with st.expander("🔍 Detalles del error"):
@@ -1,26 +1,71 @@
 from __future__ import annotations
+import copy
+import hashlib
+from collections import OrderedDict
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.compose import ColumnTransformer
-from sklearn.metrics import classification_report
 from .features import TextFeaturizer
 
+# Modelos ya entrenados, indexados por la huella del dataset etiquetado
+_FIT_CACHE_SIZE = 8
+_fit_cache: OrderedDict[str, tuple] = OrderedDict()
+
+# Predicciones recientes, indexadas por (modelo, descripciones)
+_PREDICT_CACHE_SIZE = 256
+_predict_cache: OrderedDict[tuple, object] = OrderedDict()
+
+
+def _fingerprint(df: pd.DataFrame, label_col: str) -> str:
+    hashed = pd.util.hash_pandas_object(df[['description', label_col]], index=False)
+    digest = hashlib.blake2b(hashed.to_numpy().tobytes(), digest_size=16)
+    digest.update(f"{len(df)}:{label_col}".encode())
+    return digest.hexdigest()
+
+
 class ExpenseClassifier:
     def __init__(self):
         self.text_featurizer = TextFeaturizer(max_features=4000, ngram_range=(1,2))
         # We can extend with numeric features later (amount, day-of-week, etc.)
         self.model = LogisticRegression(max_iter=200, n_jobs=None)
+        self.fingerprint = None
 
     def fit(self, df: pd.DataFrame, label_col: str = 'category'):
+        key = _fingerprint(df, label_col)
+        cached = _fit_cache.get(key)
+        if cached is not None:
+            # Mismo corpus etiquetado: reutilizar el modelo entrenado
+            _fit_cache.move_to_end(key)
+            self.text_featurizer, self.model = copy.deepcopy(cached)
+            self.fingerprint = key
+            return self
+
         X_text = self.text_featurizer.fit_transform(df['description'])
         self.model.fit(X_text, df[label_col])
+        self.fingerprint = key
+
+        _fit_cache[key] = copy.deepcopy((self.text_featurizer, self.model))
+        if len(_fit_cache) > _FIT_CACHE_SIZE:
+            _fit_cache.popitem(last=False)
         return self
 
     def predict(self, df: pd.DataFrame):
+        key = None
+        if self.fingerprint is not None:
+            hashed = pd.util.hash_pandas_object(df['description'], index=False)
+            key = (self.fingerprint, hashlib.blake2b(hashed.to_numpy().tobytes(), digest_size=16).hexdigest())
+            cached = _predict_cache.get(key)
+            if cached is not None:
+                _predict_cache.move_to_end(key)
+                return cached.copy()
+
         X_text = self.text_featurizer.transform(df['description'])
-        return self.model.predict(X_text)
+        preds = self.model.predict(X_text)
+
+        if key is not None:
+            _predict_cache[key] = preds.copy()
+            if len(_predict_cache) > _PREDICT_CACHE_SIZE:
+                _predict_cache.popitem(last=False)
+        return preds
 
     def predict_proba(self, df: pd.DataFrame):
         X_text = self.text_featurizer.transform(df['description'])
@@ -29,5 +74,6 @@ class ExpenseClassifier:
         return None
 
     def report(self, df: pd.DataFrame, true_labels: pd.Series):
+        from sklearn.metrics import classification_report  # solo se necesita al evaluar
         preds = self.predict(df)
         return classification_report(true_labels, preds, zero_division=0)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Sequence
 import pandas as pd
 import logging
 import os
@@ -18,6 +18,7 @@ class DataStore:
         """Inicialización robusta con fallbacks reales"""
         self.root = Path(self.root)
         self.db = None
+        self._summary_cache = None  # (data_version, resumen)
 
         # Configurar logging
         self._setup_logging()
@@ -221,8 +222,10 @@ class DataStore:
                 if 'original_description' not in df.columns:
                     df['original_description'] = df['description'].copy()
 
+                # Índice de contactos cargado una vez para todas las filas
+                index = self.db.build_contact_index()
                 df['description'] = df['description'].apply(
-                    self.db.enhance_description_with_contacts
+                    self.db.enhance_description_with_contacts, index=index
                 )
             return df
         except Exception as e:
@@ -235,17 +238,24 @@ class DataStore:
             if self.db is None:
                 return {'error': 'Base de datos no disponible', 'total_transactions': 0}
 
+            # Reutilizar el resumen si la base no cambió desde el último cálculo
+            version = getattr(self.db, 'data_version', None)
+            if version is not None and self._summary_cache and self._summary_cache[0] == version:
+                return dict(self._summary_cache[1])
+
             # Obtener estadísticas desde DB
             db_stats = self.db.get_statistics()
             labeled_data = self.load_labeled()
 
             if labeled_data.empty:
-                return {
+                summary = {
                     'total_transactions': 0,
                     'categories': db_stats.get('categories_count', 0),
                     'contacts': db_stats.get('contacts_count', 0),
                     'date_range': None
                 }
+                self._summary_cache = (version, summary)
+                return dict(summary)
 
             # Construir resumen básico
             summary = {
@@ -271,7 +281,8 @@ class DataStore:
                 except:
                     pass
 
-            return summary
+            self._summary_cache = (version, summary)
+            return dict(summary)
 
         except Exception as e:
             self.logger.error(f"❌ Error obteniendo resumen financiero: {e}")
@@ -310,6 +321,42 @@ class DataStore:
             self.logger.error(f"❌ Error cargando contactos: {e}")
         return []
 
+    def get_contacts_cached(self) -> Sequence[Mapping]:
+        """Contactos activos de solo lectura, servidos de memoria mientras la base no cambie"""
+        try:
+            if self.db:
+                return self.db.get_contacts_cached()
+        except Exception as e:
+            self.logger.error(f"❌ Error cargando contactos: {e}")
+        return ()
+
+    def get_contacts_df(self) -> pd.DataFrame:
+        """Obtiene contactos como DataFrame de manera segura"""
+        try:
+            if self.db:
+                return self.db.get_contacts_df(active_only=True)
+        except Exception as e:
+            self.logger.error(f"❌ Error cargando contactos: {e}")
+        return pd.DataFrame()
+
+    def search_contacts_sql(self, pattern: str, limit: int = 50, contact_type: str = None) -> List[Dict]:
+        """Busca contactos en la base (LIKE) sin cargar la tabla completa"""
+        try:
+            if self.db:
+                return self.db.search_contacts(pattern, limit=limit, contact_type=contact_type)
+        except Exception as e:
+            self.logger.error(f"❌ Error buscando contactos: {e}")
+        return []
+
+    def find_contacts_by_ruts(self, ruts: List[str]) -> Dict[str, Dict]:
+        """Busca varios contactos por RUT en una sola consulta"""
+        try:
+            if self.db:
+                return self.db.find_contacts_by_ruts(ruts)
+        except Exception as e:
+            self.logger.error(f"❌ Error buscando contactos por RUT: {e}")
+        return {}
+
     def add_contact(self, rut: str, name: str, alias: str = None, contact_type: str = 'proveedor') -> bool:
         """Agrega contacto de manera segura"""
         try:
@@ -5,6 +5,24 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import inspect
 
+try:
+    import orjson  # Serialización JSON nativa (más rápida), opcional
+except ImportError:
+    orjson = None
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    """Serializa un registro de auditoría a una línea JSON"""
+    if orjson is not None:
+        try:
+            # Claves no str (int, bool, None...) como las acepta json.dumps
+            return orjson.dumps(
+                record, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str
+            ).decode()
+        except TypeError:
+            pass  # Lo que orjson no soporta (p. ej. enteros de más de 64 bits) va por json
+    return json.dumps(record, default=str)
+
 
 class AuditLogger:
     def __init__(self, log_file: str = 'logs/audit.log'):
@@ -12,7 +30,7 @@ class AuditLogger:
         self.logger.setLevel(logging.INFO)
 
         # File handler para auditoría
-        file_handler = logging.FileHandler(log_file)
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')  # orjson escribe UTF-8 sin escapar
         file_handler.setLevel(logging.INFO)
 
         # Formato JSON para auditoría
@@ -51,7 +69,7 @@ class AuditLogger:
         if sensitive:
             audit_record['details'] = {'_redacted': True}
 
-        self.logger.info(json.dumps(audit_record))
+        self.logger.info(_dumps(audit_record))
 
     def log_security_event(self, event_type: str, details: Dict[str, Any]):
         """Log específico para eventos de seguridad"""
@@ -1,8 +1,13 @@
 # app/utils/exporters.py
+import importlib.util
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 
+# xlsxwriter escribe XLSX más rápido y con menos memoria que openpyxl; es opcional.
+# No se usa constant_memory: pandas escribe las celdas por columna y ese modo exige orden por filas.
+EXCEL_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') is not None else 'openpyxl'
+
 
 class ReportExporter:
     """Exporta reportes en diferentes formatos"""
@@ -16,7 +21,7 @@ class ReportExporter:
     ):
         """Exporta reporte de conciliación completo a Excel"""
 
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        with pd.ExcelWriter(output_path, engine=EXCEL_ENGINE) as writer:
             # Resumen ejecutivo
             summary = {
                 'Métrica': [
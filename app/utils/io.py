@@ -1,11 +1,21 @@
 from __future__ import annotations
+import importlib.util
 import pandas as pd
 from pathlib import Path
 from .schema import normalize_headers
 
+# python-calamine (Rust) lee XLSX mucho más rápido que openpyxl; es opcional
+HAS_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+
+def read_excel_fast(source, **kwargs) -> pd.DataFrame:
+    """pd.read_excel usando calamine si está instalado, openpyxl en caso contrario"""
+    if HAS_CALAMINE:
+        return pd.read_excel(source, engine="calamine", **kwargs)
+    return pd.read_excel(source, **kwargs)
+
 def read_statement_excel(path: str | Path) -> pd.DataFrame:
     path = Path(path)
-    df = pd.read_excel(path, dtype=str)
+    df = read_excel_fast(path, dtype=str)
     df.columns = [str(c).strip() for c in df.columns]
     # Normalize headers
     mapping = normalize_headers(df.columns)
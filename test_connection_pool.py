@@ -0,0 +1,118 @@
+# test_connection_pool.py - Prueba la devolución y reposición de conexiones del pool
+import sqlite3
+import sys
+from pathlib import Path
+from queue import Empty
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / 'app'))
+
+from database.connection_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return ConnectionPool(str(tmp_path / 'pool.db'), max_connections=2)
+
+
+def test_connection_returns_to_pool(pool):
+    with pool.get_connection() as conn:
+        conn.execute("SELECT 1")
+        assert pool.pool.qsize() == 1
+
+    assert pool.pool.qsize() == 2
+    assert conn in pool._owned
+
+
+def test_integrity_error_keeps_the_same_connection(pool):
+    with pool.get_connection() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+        conn.commit()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.get_connection() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            conn.execute("INSERT INTO t VALUES (1)")
+
+    assert conn in pool._owned
+    assert pool.pool.qsize() == 2
+    # La transacción a medias se deshizo antes de devolver la conexión
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+
+    # Es la misma conexión que vuelve a entregarse (FIFO: la otra sale primero)
+    with pool.get_connection(), pool.get_connection() as again:
+        assert again is conn
+
+
+def test_statement_error_keeps_the_connection(pool):
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.get_connection() as conn:
+            conn.execute("SELECT * FROM tabla_inexistente")
+
+    assert conn in pool._owned
+    assert pool.pool.qsize() == 2
+
+
+def test_unusable_connection_is_replaced(pool):
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.get_connection() as conn:
+            conn.close()
+            conn.execute("SELECT 1")
+
+    assert conn not in pool._owned
+    assert pool._missing == 1
+
+    # El próximo préstamo repone la conexión sin esperar al timeout del pool
+    with pool.get_connection() as fresh:
+        assert fresh.execute("SELECT 1").fetchone() == (1,)
+    assert pool._missing == 0
+    assert len(pool._owned) == 2
+    assert pool.pool.qsize() == 2
+
+
+def test_failed_reconnect_is_retried_later(pool, monkeypatch):
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.get_connection() as conn:
+            conn.close()
+            conn.execute("SELECT 1")
+
+    create = pool._create_connection
+
+    def failing():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(pool, '_create_connection', failing)
+    with pool.get_connection() as other:
+        assert other in pool._owned
+    assert pool._missing == 1
+
+    monkeypatch.setattr(pool, '_create_connection', create)
+    with pool.get_connection():
+        pass
+    assert pool._missing == 0
+    assert pool.pool.qsize() == 2
+
+
+def test_other_errors_keep_the_connection(pool):
+    with pytest.raises(ValueError):
+        with pool.get_connection() as conn:
+            raise ValueError("error de la aplicación")
+
+    assert conn in pool._owned
+    assert pool.pool.qsize() == 2
+
+
+def test_temporary_connection_is_closed(pool, monkeypatch):
+    def empty(timeout=None):
+        raise Empty
+
+    # Pool agotado: get_connection crea una conexión temporal y la cierra al salir
+    monkeypatch.setattr(pool.pool, 'get', empty)
+    with pool.get_connection() as temp:
+        assert temp not in pool._owned
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        temp.execute("SELECT 1")
+    assert len(pool._owned) == 2
@@ -0,0 +1,213 @@
+# test_db_manager.py - Prueba las operaciones de contactos de DatabaseManager
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / 'app'))
+
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Base temporal con dos contactos propios (además de los de ejemplo)"""
+    db = DatabaseManager(str(tmp_path / 'test.db'))
+    db.add_contact('10.503.375-3', 'Juan Pérez', 'Juan')
+    db.add_contact('14.671.670-9', 'María González', None, 'empleado')
+    return db
+
+
+def _deactivate(db, rut):
+    with db.get_connection() as conn:
+        conn.execute("UPDATE contacts SET is_active = 0 WHERE rut = ?", (rut,))
+        conn.commit()
+
+
+# === bulk_upsert_contacts ===
+
+def test_bulk_upsert_inserts_new_contacts(db):
+    counts = db.bulk_upsert_contacts([
+        ('11.111.111-1', ' Ana Pérez ', 'Ana'),
+        ('22222222-2', 'Luis Soto', None),
+    ])
+
+    assert counts == {'inserted': 2, 'updated': 0, 'duplicates': 0, 'errors': 0}
+    ana = db.find_contact_by_rut('11111111-1')
+    assert ana['name'] == 'Ana Pérez'
+    assert ana['alias'] == 'Ana'
+    assert ana['contact_type'] == 'cliente'
+    assert db.find_contact_by_rut('22.222.222-2')['alias'] is None
+
+
+def test_bulk_upsert_counts_repeated_ruts_in_batch_as_duplicates(db):
+    counts = db.bulk_upsert_contacts([
+        ('11.111.111-1', 'Ana Pérez', None),
+        ('11111111-1', 'Ana P.', None),
+    ])
+
+    assert counts == {'inserted': 1, 'updated': 0, 'duplicates': 1, 'errors': 0}
+    assert db.find_contact_by_rut('11111111-1')['name'] == 'Ana Pérez'
+
+
+def test_bulk_upsert_keeps_existing_without_overwrite(db):
+    counts = db.bulk_upsert_contacts([('10.503.375-3', 'Otro Nombre', 'Otro')])
+
+    assert counts == {'inserted': 0, 'updated': 0, 'duplicates': 1, 'errors': 0}
+    juan = db.find_contact_by_rut('10.503.375-3')
+    assert (juan['name'], juan['alias']) == ('Juan Pérez', 'Juan')
+
+
+def test_bulk_upsert_overwrite_updates_and_coalesces_empty_fields(db):
+    counts = db.bulk_upsert_contacts([
+        ('10.503.375-3', 'Juan Pérez Soto', ''),
+        ('14.671.670-9', '', 'Mary'),
+    ], overwrite_existing=True)
+
+    assert counts == {'inserted': 0, 'updated': 2, 'duplicates': 0, 'errors': 0}
+    juan = db.find_contact_by_rut('10.503.375-3')
+    assert (juan['name'], juan['alias']) == ('Juan Pérez Soto', 'Juan')
+    maria = db.find_contact_by_rut('14.671.670-9')
+    assert (maria['name'], maria['alias']) == ('María González', 'Mary')
+    assert maria['contact_type'] == 'empleado'
+
+
+def test_bulk_upsert_counts_inactive_ruts_as_errors(db):
+    _deactivate(db, '10503375-3')
+
+    counts = db.bulk_upsert_contacts([
+        ('10.503.375-3', 'Juan Pérez', None),
+        ('33.333.333-3', 'Nuevo', None),
+    ], overwrite_existing=True)
+
+    assert counts == {'inserted': 1, 'updated': 0, 'duplicates': 0, 'errors': 1}
+    assert db.find_contact_by_rut('10.503.375-3') is None
+    with db.get_connection() as conn:
+        row = conn.execute("SELECT is_active FROM contacts WHERE rut = ?", ('10503375-3',)).fetchone()
+    assert row['is_active'] == 0
+
+
+def test_bulk_upsert_rolls_back_whole_batch_on_error(db):
+    # El UPDATE falla después de que el INSERT del mismo lote ya se ejecutó
+    with db.get_connection() as conn:
+        conn.execute("""
+            CREATE TRIGGER fail_update BEFORE UPDATE ON contacts
+            BEGIN SELECT RAISE(ABORT, 'update bloqueado'); END
+        """)
+        conn.commit()
+    before = len(db.get_contacts())
+    version = db.data_version[0]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db.bulk_upsert_contacts([
+            ('44.444.444-4', 'Nuevo', None),
+            ('10.503.375-3', 'Juan Pérez Soto', None),
+        ], overwrite_existing=True)
+
+    assert len(db.get_contacts()) == before
+    assert db.find_contact_by_rut('44.444.444-4') is None
+    assert db.data_version[0] == version
+    # La transacción quedó cerrada: otra escritura funciona
+    assert db.bulk_upsert_contacts([('44.444.444-4', 'Nuevo', None)])['inserted'] == 1
+
+
+def test_bulk_upsert_empty_batch(db):
+    assert db.bulk_upsert_contacts([]) == {'inserted': 0, 'updated': 0, 'duplicates': 0, 'errors': 0}
+
+
+# === search_contacts ===
+
+def test_search_contacts_folds_non_ascii_case(db):
+    db.add_contact('11.111.111-1', 'ÁLVARO MUÑOZ', 'Ñandú')
+    db.add_contact('22.222.222-2', 'Álvaro Peña', None)
+
+    names = {c['name'] for c in db.search_contacts('álvaro')}
+    assert names == {'ÁLVARO MUÑOZ', 'Álvaro Peña'}
+    assert [c['name'] for c in db.search_contacts('muñoz')] == ['ÁLVARO MUÑOZ']
+    assert [c['name'] for c in db.search_contacts('ÑANDÚ')] == ['ÁLVARO MUÑOZ']
+    assert db.search_contacts('ÁLVARO', contact_type='empleado') == []
+
+
+def test_search_contacts_is_literal_and_matches_rut(db):
+    db.add_contact('11.111.111-k', 'Ana 100% Pérez', None)
+
+    assert [c['rut'] for c in db.search_contacts('11111111-K')] == ['11111111-K']
+    assert [c['name'] for c in db.search_contacts('100%')] == ['Ana 100% Pérez']
+    assert db.search_contacts('a_a') == []
+
+
+# === find_contacts_by_ruts ===
+
+def _dv(number):
+    return 'K' if number % 11 == 0 else str(number % 10)
+
+
+def _formatted(number, dv, style):
+    """Mismo RUT en distintos formatos de entrada"""
+    if style == 0:
+        return f"{number:,}".replace(',', '.') + f"-{dv}"
+    if style == 1:
+        return f"{number}-{dv.lower()}"
+    return f"{number}{dv.lower()}"
+
+
+def test_find_contacts_by_ruts_spans_in_chunks_and_normalizes_keys(db):
+    numbers = range(20_000_000, 20_001_200)
+    counts = db.bulk_upsert_contacts([(f"{n}-{_dv(n)}", f"Contacto {n}", None) for n in numbers])
+    assert counts['inserted'] == 1200
+
+    requested = [_formatted(n, _dv(n), n % 3) for n in numbers]
+    missing = ['30.000.000-1', '', None]
+    found = db.find_contacts_by_ruts(requested + missing)
+
+    # Más de 500 RUTs: varias consultas IN; las claves son los RUTs tal como se pidieron
+    assert set(found) == set(requested)
+    for rut, n in zip(requested, numbers):
+        assert found[rut]['rut'] == f"{n}-{_dv(n)}"
+        assert found[rut]['name'] == f"Contacto {n}"
+
+
+def test_find_contacts_by_ruts_maps_every_spelling_of_the_same_rut(db):
+    db.add_contact('11.111.111-k', 'Ana Pérez', None)
+    _deactivate(db, '10503375-3')
+
+    found = db.find_contacts_by_ruts(['11.111.111-K', '11111111k', '11111111-k', '10.503.375-3'])
+
+    assert set(found) == {'11.111.111-K', '11111111k', '11111111-k'}
+    assert {c['rut'] for c in found.values()} == {'11111111-K'}
+    assert db.find_contacts_by_ruts([]) == {}
+
+
+# === update_contact ===
+
+def test_update_contact_unknown_rut_returns_false(db):
+    version = db.data_version[0]
+
+    assert db.update_contact('99.999.999-9', name='Nadie') is False
+    assert db.update_contact('10.503.375-3') is False  # Sin campos que actualizar
+    assert db.data_version[0] == version
+
+
+def test_update_contact_none_fields_keep_existing_values(db):
+    assert db.update_contact('10.503.375-3', name='Juan Pérez Soto') is True
+    juan = db.find_contact_by_rut('10503375-3')
+    assert (juan['name'], juan['alias']) == ('Juan Pérez Soto', 'Juan')
+
+    assert db.update_contact('10503375-3', alias='JP') is True
+    juan = db.find_contact_by_rut('10503375-3')
+    assert (juan['name'], juan['alias']) == ('Juan Pérez Soto', 'JP')
+
+
+def test_update_contact_invalidates_contacts_cache(db):
+    # Poblar los cachés derivados antes de escribir
+    assert db.find_contact_by_rut('14.671.670-9')['alias'] is None
+    assert db.build_contact_index()['14671670-9'] == 'María González'
+    version = db.data_version
+
+    assert db.update_contact('14.671.670-9', alias='Mary') is True
+
+    assert db.data_version[0] == version[0] + 1
+    assert db.find_contact_by_rut('14.671.670-9')['alias'] == 'Mary'
+    assert db.build_contact_index()['14671670-9'] == 'Mary'
+    assert any(c['alias'] == 'Mary' for c in db.get_contacts_cached())